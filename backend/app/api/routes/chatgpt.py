@@ -2,7 +2,6 @@
 ChatGPT API routes for analytics mode chat interface.
 Supports streaming text and images.
 """
-import json
 import uuid
 import logging
 import os
@@ -13,6 +12,7 @@ from flask import Blueprint, request, jsonify, Response, stream_with_context, se
 from flask_babel import _
 from openai import OpenAI
 from app.utils.validation_constants import MESSAGE_MAX_LENGTH
+from app.utils.json_utils import json_dumps, json_loads
 from app.services.chatgpt.session_storage import (
     get_chatgpt_session,
     save_chatgpt_session,
@@ -138,7 +138,7 @@ def _create_chatgpt_stream_response(history: List[Dict], session_id: str):
                 # Process each tool call
                 for tool_call in tool_calls:
                     if tool_call.function.name == "generate_image":
-                        args = json.loads(tool_call.function.arguments)
+                        args = json_loads(tool_call.function.arguments)
                         image_prompt = args.get("prompt", "")
                         
                         # Generate image
@@ -150,7 +150,7 @@ def _create_chatgpt_stream_response(history: List[Dict], session_id: str):
                             messages.append({
                                 "role": "tool",
                                 "tool_call_id": tool_call.id,
-                                "content": json.dumps({"image_url": image_url, "status": "generated"})
+                                "content": json_dumps({"image_url": image_url, "status": "generated"})
                             })
                         else:
                             # Add function result to messages (failure)
@@ -158,7 +158,7 @@ def _create_chatgpt_stream_response(history: List[Dict], session_id: str):
                             messages.append({
                                 "role": "tool",
                                 "tool_call_id": tool_call.id,
-                                "content": json.dumps({"status": "failed", "error": _("Image generation failed")})
+                                "content": json_dumps({"status": "failed", "error": _("Image generation failed")})
                             })
                 
                 # Get final response after function calls (stream this)
@@ -181,14 +181,14 @@ def _create_chatgpt_stream_response(history: List[Dict], session_id: str):
                             accumulated_text += text_delta
                             # Emit chunk (sanitization will be done on final message)
                             payload = {"type": "chunk", "delta": text_delta}
-                            yield f"data: {json.dumps(payload)}\n\n"
+                            yield f"data: {json_dumps(payload)}\n\n"
             else:
                 # No function calls, emit the content as chunks
                 accumulated_text = assistant_message.content or ""
                 # Emit the content character by character to simulate streaming
                 for char in accumulated_text:
                     payload = {"type": "chunk", "delta": char}
-                    yield f"data: {json.dumps(payload)}\n\n"
+                    yield f"data: {json_dumps(payload)}\n\n"
             
             # Sanitize the accumulated text for security
             sanitized_text = sanitize_tutor_message(accumulated_text)
@@ -203,12 +203,12 @@ def _create_chatgpt_stream_response(history: List[Dict], session_id: str):
                 "message": sanitized_text,
                 "images": images,
             }
-            yield f"data: {json.dumps(payload)}\n\n"
+            yield f"data: {json_dumps(payload)}\n\n"
             
         except Exception as e:
             logger.error(f"Error in ChatGPT stream: {e}")
             error_payload = {"type": "error", "error": str(e)}
-            yield f"data: {json.dumps(error_payload)}\n\n"
+            yield f"data: {json_dumps(error_payload)}\n\n"
     
     return event_stream
 
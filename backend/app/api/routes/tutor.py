@@ -1,5 +1,3 @@
-import json
-import uuid
 from typing import List, Dict
 from flask import Blueprint, request, jsonify
 from flask_babel import _, get_locale
@@ -8,11 +6,22 @@ from app.services.language_generation.gpt_generator import generate_visual_langu
 from app.services.tutor.gemini_tutor import (
     start_tutor_session,
     _generate_tutor_reply_stream,
-    MAX_HISTORY,
+    is_final_answer,
+    trim_history,
+    NUMERIC_FAST_PATH_ENABLED,
+    ROLE_STUDENT,
+    ROLE_TUTOR,
+)
+from app.services.tutor.session_storage import (
+    get_session,
+    save_session,
+    delete_session,
+    new_session_id,
+    update_session_metadata,
 )
-from app.services.tutor.session_storage import get_session, save_session, delete_session
 from app.services.tutor.dsl_container_types import apply_container_type_modifications
 from app.utils.validation_constants import MWP_MAX_LENGTH, MESSAGE_MAX_LENGTH
+from app.utils.json_utils import json_dumps
 from flask import Response, stream_with_context
 import re
 
@@ -36,7 +45,7 @@ def _is_new_mwp_supported_by_last_student_message(extracted_mwp: str, history: L
     if not mwp_norm:
         return False
     last_student = next(
-        (h.get("content") or "" for h in reversed(history) if h.get("role") == "student"),
+        (h.get("content") or "" for h in reversed(history) if h.get("role") == ROLE_STUDENT),
         "",
     )
     student_norm = _normalize_text_for_contains_check(last_student)
@@ -60,27 +69,35 @@ def _extract_new_mwp(text: str) -> str | None:
     return mwp or None
 
 
-def _create_tutor_stream_response(visual_language: str, history: List[Dict[str, str]], language: str, session_id: str = None):
+def _create_tutor_stream_response(visual_language: str, history: List[Dict[str, str]], language: str, session_id: str = None,
+                                  include_visual_language: bool = False, preferred_variant: str | None = None):
     """
     Helper function to create a streaming response for tutor replies.
     Used by both start/stream and message/stream endpoints.
+    If include_visual_language is set, the done event carries the session's visual_language.
+    preferred_variant is the session's remembered visual variant, as loaded by the caller.
     """
     def event_stream():
+        nonlocal preferred_variant
         try:
             visual_request = None
+            # Visual rendered while the reply was still streaming: (visual_request, visual)
+            early_visual = None
 
             def _emit_chunk(delta: str):
                 payload = {"type": "chunk", "delta": delta}
-                return f"data: {json.dumps(payload)}\n\n"
+                return f"data: {json_dumps(payload)}\n\n"
 
-            def _emit_done(final_text: str, visual):
+            def _emit_done(final_text: str, visual, done_visual_language: str | None = None):
                 payload = {
                     "type": "done",
                     "session_id": session_id,
                     "tutor_message": final_text,
                     "visual": visual,
                 }
-                return f"data: {json.dumps(payload)}\n\n"
+                if done_visual_language is not None:
+                    payload["visual_language"] = done_visual_language
+                return f"data: {json_dumps(payload)}\n\n"
 
             def _emit_suppress_done():
                 """
@@ -94,19 +111,35 @@ def _create_tutor_stream_response(visual_language: str, history: List[Dict[str,
                     "visual": None,
                     "suppress_message": True,
                 }
-                return f"data: {json.dumps(payload)}\n\n"
+                if include_visual_language:
+                    payload["visual_language"] = visual_language
+                return f"data: {json_dumps(payload)}\n\n"
 
-            def _finalize_and_persist(final_text: str, vr: dict | None, current_vl: str):
+            def _finalize_and_persist(final_text: str, vr: dict | None, current_vl: str, visual=None):
                 # Update history with visual request DSL if present
-                tutor_entry = {"role": "tutor", "content": final_text}
+                tutor_entry = {"role": ROLE_TUTOR, "content": final_text}
                 if vr:
                     tutor_entry["visual_request"] = vr
                 history.append(tutor_entry)
 
                 # Update session if session_id provided
                 if session_id:
-                    truncated_history = history[-MAX_HISTORY:]
-                    save_session(session_id, current_vl, truncated_history)
+                    # An early render may have fallen back to the other variant before the
+                    # session row existed; remember that variant here
+                    metadata = None
+                    if visual and visual.get("svg") and visual.get("variant") not in (vr.get("variant") or "intuitive", preferred_variant):
+                        metadata = {"preferred_variant": visual["variant"]}
+                    save_session(session_id, current_vl, trim_history(history), metadata=metadata)
+
+            def _finalize_with_visual(final_text: str, vr: dict | None, current_vl: str):
+                """Persist the reply and return its visual, reusing the one rendered during streaming if it matches."""
+                if vr and early_visual is not None and early_visual[0] == vr:
+                    visual = early_visual[1]
+                    _finalize_and_persist(final_text, vr, current_vl, visual)
+                    return visual
+                _finalize_and_persist(final_text, vr, current_vl)
+                return _render_visual_request(vr, current_vl, session_id=session_id,
+                                              preferred_variant=preferred_variant)
 
             def _stream_reply_events(current_vl: str):
                 """
@@ -116,11 +149,20 @@ def _create_tutor_stream_response(visual_language: str, history: List[Dict[str,
                 Returns: (mode, final_text, visual_request)
                   - mode: "normal" | "new_mwp"
                 """
+                nonlocal early_visual
                 buffered = ""
                 mode = None  # None=undecided, "normal", "new_mwp"
                 last_visual_request = None
 
                 for chunk in _generate_tutor_reply_stream(current_vl, history, language):
+                    if isinstance(chunk, dict) and chunk.get("__visual_early__"):
+                        # Render while the model is still producing the rest of the reply
+                        if mode != "new_mwp":
+                            early_request = chunk.get("visual_request")
+                            early_visual = (early_request,
+                                            _render_visual_request(early_request, current_vl, session_id=session_id,
+                                                                   preferred_variant=preferred_variant))
+                        continue
                     if not (isinstance(chunk, dict) and chunk.get("__done__")):
                         delta = chunk or ""
                         if mode is None:
@@ -166,7 +208,7 @@ def _create_tutor_stream_response(visual_language: str, history: List[Dict[str,
                 raw = extract_visual_language(vl_response)
                 if not raw:
                     err_payload = {"type": "error", "error": _("Did not get Visual Language from AI. Please try again.")}
-                    yield f"data: {json.dumps(err_payload)}\n\n"
+                    yield f"data: {json_dumps(err_payload)}\n\n"
                     return
                 new_dsl = raw.split(":", 1)[1].strip() if raw.lower().startswith("visual_language:") else raw.strip()
                 
@@ -174,44 +216,42 @@ def _create_tutor_stream_response(visual_language: str, history: List[Dict[str,
                 new_dsl = apply_container_type_modifications(new_dsl)
 
                 # Reset conversation history to the new problem (keep session_id stable)
+                preferred_variant = None  # Recreating the session drops its metadata
                 history.clear()
-                history.append({"role": "student", "content": mwp})
+                history.append({"role": ROLE_STUDENT, "content": mwp})
                 if session_id:
                     delete_session(session_id)
-                    save_session(session_id, new_dsl, history[-MAX_HISTORY:])
+                    save_session(session_id, new_dsl, trim_history(history))
 
                 new_mode, new_final_text, new_visual_request = yield from _stream_reply_events(new_dsl)
                 if new_mode == "new_mwp":
                     err_payload = {"type": "error", "error": _("Could not start a new problem. Please try again.")}
-                    yield f"data: {json.dumps(err_payload)}\n\n"
+                    yield f"data: {json_dumps(err_payload)}\n\n"
                     return
 
-                _finalize_and_persist(new_final_text, new_visual_request, new_dsl)
-                visual = _render_visual_request(new_visual_request, new_dsl, session_id=session_id)
-                done_event = json.loads(_emit_done(new_final_text, visual)[6:])
-                done_event["visual_language"] = new_dsl
-                yield f"data: {json.dumps(done_event)}\n\n"
+                visual = _finalize_with_visual(new_final_text, new_visual_request, new_dsl)
+                yield _emit_done(new_final_text, visual, new_dsl)
                 return
 
-            _finalize_and_persist(final_text, visual_request, visual_language)
-            visual = _render_visual_request(visual_request, visual_language, session_id=session_id)
-            yield _emit_done(final_text, visual)
+            visual = _finalize_with_visual(final_text, visual_request, visual_language)
+            yield _emit_done(final_text, visual, visual_language if include_visual_language else None)
             return
         except Exception as e:
             err_payload = {"type": "error", "error": str(e)}
-            yield f"data: {json.dumps(err_payload)}\n\n"
+            yield f"data: {json_dumps(err_payload)}\n\n"
     
     return event_stream
 
 
-def _render_visual_request(visual_request: dict, fallback_dsl: str, session_id: str = None):
+def _render_visual_request(visual_request: dict, fallback_dsl: str, session_id: str = None,
+                           preferred_variant: str | None = None):
+    """
+    Render a tutor visual request. preferred_variant is the session's variant from a previous
+    fallback; callers pass it from the session they already loaded instead of re-reading it.
+    """
     if not visual_request:
         return None
 
-    # Check if session has a preferred variant (from previous fallback)
-    session = get_session(session_id) if session_id else None
-    preferred_variant = session.get("preferred_variant") if session else None
-    
     # Use preferred variant if available, otherwise use requested variant
     requested_variant = visual_request.get("variant") or "intuitive"
     variant = preferred_variant if preferred_variant else requested_variant
@@ -235,11 +275,8 @@ def _render_visual_request(visual_request: dict, fallback_dsl: str, session_id:
         # If fallback succeeded, use it and store as preferred for this session
         if fallback_svg:
             # Remember this fallback variant for future requests in this session
-            if session:
-                # Update session with preferred variant
-                visual_language = session.get("visual_language", fallback_dsl)
-                history = session.get("history", [])
-                save_session(session_id, visual_language, history, metadata={"preferred_variant": fallback_variant})
+            if session_id:
+                update_session_metadata(session_id, {"preferred_variant": fallback_variant})
             
             return {
                 "variant": fallback_variant,
@@ -271,7 +308,7 @@ def tutor_start():
 
     # If no MWP provided, create session without DSL (autostart mode)
     if not mwp:
-        session_id = str(uuid.uuid4())
+        session_id = new_session_id()
         empty_dsl = ""
         # Create session with empty history and empty visual_language
         save_session(session_id, empty_dsl, [])
@@ -318,18 +355,18 @@ def tutor_start_stream():
     if mwp and len(mwp) > MWP_MAX_LENGTH:
         err_payload = {"type": "error", "error": _("Math word problem is too long (max %(max)d characters).", max=MWP_MAX_LENGTH)}
         def error_stream():
-            yield f"data: {json.dumps(err_payload)}\n\n"
+            yield f"data: {json_dumps(err_payload)}\n\n"
         return Response(stream_with_context(error_stream()), mimetype="text/event-stream")
 
     # If no MWP provided, create session without DSL (autostart mode)
     if not mwp:
-        session_id = str(uuid.uuid4())
+        session_id = new_session_id()
         empty_dsl = ""
         history: List[Dict[str, str]] = []
         save_session(session_id, empty_dsl, history)
         # Return empty response for autostart
         def empty_stream():
-            yield f"data: {json.dumps({'type': 'done', 'session_id': session_id, 'tutor_message': '', 'visual_language': empty_dsl, 'visual': None})}\n\n"
+            yield f"data: {json_dumps({'type': 'done', 'session_id': session_id, 'tutor_message': '', 'visual_language': empty_dsl, 'visual': None})}\n\n"
         return Response(stream_with_context(empty_stream()), mimetype="text/event-stream")
 
     # Generate visual language via GPT backend
@@ -343,27 +380,13 @@ def tutor_start_stream():
     dsl = apply_container_type_modifications(dsl)
 
     # Create session and get initial history
-    session_id = str(uuid.uuid4())
-    history: List[Dict[str, str]] = [{"role": "student", "content": mwp}]
+    session_id = new_session_id()
+    history: List[Dict[str, str]] = [{"role": ROLE_STUDENT, "content": mwp}]
     
-    event_stream = _create_tutor_stream_response(dsl, history, str(language), session_id=session_id)
-    
-    # Add visual_language to done payload for start endpoint
-    original_stream = event_stream
-    def enhanced_stream():
-        for event in original_stream():
-            if event.startswith("data: "):
-                try:
-                    payload = json.loads(event[6:])
-                    if payload.get("type") == "done":
-                        payload["visual_language"] = dsl
-                        yield f"data: {json.dumps(payload)}\n\n"
-                        continue
-                except:
-                    pass
-            yield event
-    
-    return Response(stream_with_context(enhanced_stream()), mimetype="text/event-stream")
+    # The start endpoint also returns the generated visual_language in the done payload
+    event_stream = _create_tutor_stream_response(dsl, history, str(language), session_id=session_id,
+                                                 include_visual_language=True)
+    return Response(stream_with_context(event_stream()), mimetype="text/event-stream")
 
 
 @tutor_bp.route("/api/tutor/message/stream", methods=["POST"])
@@ -393,9 +416,30 @@ def tutor_message_stream():
     history: List[Dict[str, str]] = session.get("history", [])
 
     # Append user message to history before generation
-    history.append({"role": "student", "content": user_message})
+    history.append({"role": ROLE_STUDENT, "content": user_message})
+
+    # A bare, correct final answer gets a fixed reply instead of a Gemini round-trip
+    if NUMERIC_FAST_PATH_ENABLED and is_final_answer(user_message, visual_language, history):
+        tutor_message = _("Correct, well done! That is the answer to the problem. If you like, enter a new math word problem.")
+        # Close the problem with the formal visual of the full DSL, as the tutor prompt requires
+        visual_request = {"variant": "formal", "dsl_scope": visual_language}
+        history.append({"role": ROLE_TUTOR, "content": tutor_message, "visual_request": visual_request})
+        save_session(session_id, visual_language, trim_history(history))
+        preferred_variant = session.get("preferred_variant")
+
+        def fast_path_stream():
+            yield f"data: {json_dumps({'type': 'chunk', 'delta': tutor_message})}\n\n"
+            try:
+                visual = _render_visual_request(visual_request, visual_language, session_id=session_id,
+                                                preferred_variant=preferred_variant)
+            except Exception as e:
+                yield f"data: {json_dumps({'type': 'error', 'error': str(e)})}\n\n"
+                return
+            yield f"data: {json_dumps({'type': 'done', 'session_id': session_id, 'tutor_message': tutor_message, 'visual': visual})}\n\n"
+        return Response(stream_with_context(fast_path_stream()), mimetype="text/event-stream")
 
-    event_stream = _create_tutor_stream_response(visual_language, history, language, session_id=session_id)
+    event_stream = _create_tutor_stream_response(visual_language, history, language, session_id=session_id,
+                                                 preferred_variant=session.get("preferred_variant"))
     return Response(stream_with_context(event_stream()), mimetype="text/event-stream")
 
 
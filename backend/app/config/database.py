@@ -6,12 +6,14 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Generator, Iterator
 
-from sqlalchemy import create_engine, text, event, TypeDecorator, DateTime as SQLDateTime
+from sqlalchemy import create_engine, text, TypeDecorator, DateTime as SQLDateTime
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+from app.utils.json_utils import json_dumps, json_loads
+
 # Load environment variables from backend .env first (for backend-specific config)
 load_dotenv()
 
@@ -72,29 +74,20 @@ def create_database_engine():
             'echo': os.getenv('DATABASE_ECHO', 'false').lower() == 'true',
             'pool_pre_ping': True,
             'pool_recycle': 300,  # Recycle connections every 5 minutes
+            # JSON columns (tutor history, metadata) go through orjson when it is installed
+            'json_serializer': json_dumps,
+            'json_deserializer': json_loads,
         }
         
-        ENGINE = create_engine(database_url, **engine_kwargs)
-        
         # For PostgreSQL, ensure all connections use UTC timezone
         # This is critical when using multiple Gunicorn workers to avoid
-        # timezone-related session expiration issues
+        # timezone-related session expiration issues.
+        # Passed as a startup option so it holds for the connection's lifetime (a SET can be
+        # undone by a rollback) without an extra round-trip on every pool checkout.
         if database_url.startswith('postgresql'):
-            @event.listens_for(ENGINE, "connect")
-            def set_timezone_on_connect(dbapi_conn, connection_record):
-                """Set timezone to UTC for all new PostgreSQL connections."""
-                cursor = dbapi_conn.cursor()
-                cursor.execute("SET timezone = 'UTC'")
-                cursor.close()
-            
-            @event.listens_for(ENGINE, "checkout")
-            def set_timezone_on_checkout(dbapi_conn, connection_record, connection_proxy):
-                """Set timezone to UTC when connections are checked out from the pool.
-                This ensures reused connections also have the correct timezone setting.
-                """
-                cursor = dbapi_conn.cursor()
-                cursor.execute("SET timezone = 'UTC'")
-                cursor.close()
+            engine_kwargs['connect_args'] = {'options': '-c timezone=UTC'}
+        
+        ENGINE = create_engine(database_url, **engine_kwargs)
         
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ENGINE)
     
@@ -28,10 +28,10 @@ class TutorSession(Base):
     session_metadata = Column(JSON, nullable=True, default=dict)  # For storing additional fields like preferred_variant
     # Store UTC timestamps as timezone-aware datetimes (TIMESTAMP WITH TIME ZONE in PostgreSQL)
     # UTCDateTime ensures all retrieved values are normalized to UTC, regardless of connection timezone
-    created_at = Column(UTCDateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
-    last_activity = Column(UTCDateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    last_activity = Column(UTCDateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     
-    # Indexes for efficient queries
+    # Indexes for efficient queries (declared once here; index=True on the columns would add identical duplicates)
     __table_args__ = (
         Index('idx_tutor_session_last_activity', 'last_activity'),
         Index('idx_tutor_session_created', 'created_at'),
@@ -12,6 +12,23 @@ logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv(override=True)
+# Configure once: genai.configure() drops the SDK's cached API clients, so calling it per
+# request would open a new connection every time (also for the tutor, which shares them)
+genai.configure(api_key=os.environ.get("GEMINI_API_KEY"))
+
+ICON_MODEL_NAME = 'gemini-pro-latest'
+
+# Shared model instance; GenerativeModel holds no per-request state
+_model_instance = None
+
+
+def _get_model():
+    """Get the shared Gemini model instance used for icon generation."""
+    global _model_instance
+    if _model_instance is None:
+        _model_instance = genai.GenerativeModel(ICON_MODEL_NAME)
+    return _model_instance
+
 
 def generate_svg_icon(entity_name: str) -> Tuple[bool, Optional[str], Optional[str]]:
     """
@@ -23,14 +40,8 @@ def generate_svg_icon(entity_name: str) -> Tuple[bool, Optional[str], Optional[s
     Returns:
         Tuple of (success, svg_content, error_message)
     """
-    api_key = os.environ.get("GEMINI_API_KEY")
-    
     try:
-        # Configure Gemini API
-        genai.configure(api_key=api_key)
-        
-        # Use gemini-pro model (you can adjust this based on your needs)
-        model = genai.GenerativeModel('gemini-pro-latest')
+        model = _get_model()
         
         # Create the prompt
         prompt = f"Generate a SVG icon for '{entity_name}'."
@@ -133,39 +133,54 @@ def serialize_entity(entity: Dict) -> str:
     return f"{entity_name}[{', '.join(parts)}]"
 
 
-def serialize_dsl(node: Dict) -> str:
+def _write_dsl(node: Dict, out: List[str]) -> None:
     """
-    Serialize a parsed DSL node back to DSL string format.
-    
-    Parameters:
-    node: Parsed DSL node (dict with operation, entities, result_container)
-    
-    Returns:
-    DSL string representation
+    Append the DSL fragments for a parsed node to out.
+    Nested operations write into the same buffer, so each fragment is copied once
+    by the final join instead of once per nesting level.
     """
-    op = node.get("operation", "")
-    entities_list = node.get("entities", [])
-    result_container = node.get("result_container")
-    
-    parts = []
-    
+    out.append(node.get("operation", ""))
+    out.append("(")
+    first = True
+
     # Serialize entities (which may be nested operations or entities)
-    for entity in entities_list:
+    for entity in node.get("entities", []):
+        if not first:
+            out.append(", ")
+        first = False
         if "operation" in entity:
             # This is a nested operation
-            parts.append(serialize_dsl(entity))
+            _write_dsl(entity, out)
         else:
             # This is a regular entity
-            parts.append(serialize_entity(entity))
-    
+            out.append(serialize_entity(entity))
+
     # Add result container if present
+    result_container = node.get("result_container")
     if result_container and isinstance(result_container, dict):
+        if not first:
+            out.append(", ")
         # Create a copy with name set to result_container
         result_entity = dict(result_container)
         result_entity["name"] = "result_container"
-        parts.append(serialize_entity(result_entity))
+        out.append(serialize_entity(result_entity))
+
+    out.append(")")
+
+
+def serialize_dsl(node: Dict) -> str:
+    """
+    Serialize a parsed DSL node back to DSL string format.
+    
+    Parameters:
+    node: Parsed DSL node (dict with operation, entities, result_container)
     
-    return f"{op}({', '.join(parts)})"
+    Returns:
+    DSL string representation
+    """
+    out: List[str] = []
+    _write_dsl(node, out)
+    return "".join(out)
 
 
 def apply_container_type_modifications(dsl_str: str) -> str:
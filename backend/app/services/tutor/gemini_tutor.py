@@ -1,12 +1,21 @@
-import json
+import asyncio
+import datetime
+import functools
+import hashlib
+import io
+import math
 import os
 import re
-import uuid
+import time
 import logging
+import weakref
+from collections import OrderedDict
+from itertools import islice
 from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google.generativeai import caching
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +25,34 @@ genai.configure(api_key=os.environ.get("GEMINI_API_KEY"))
 # Default to the latest Pro model; allow override via GEMINI_TUTOR_MODEL
 MODEL_NAME = os.environ.get("GEMINI_TUTOR_MODEL", "gemini-pro-latest")
 
-from app.services.tutor.session_storage import save_session
+# Answer a bare numeric final answer without calling Gemini (opt-in via TUTOR_NUMERIC_FAST_PATH)
+NUMERIC_FAST_PATH_ENABLED = os.environ.get("TUTOR_NUMERIC_FAST_PATH", "false").lower() == "true"
+
+# Keep SYSTEM_PROMPT in a server-side Gemini context cache instead of sending it every turn
+# (opt-in via GEMINI_TUTOR_CONTEXT_CACHE). Needs a model version that supports context caching.
+CONTEXT_CACHE_ENABLED = os.environ.get("GEMINI_TUTOR_CONTEXT_CACHE", "false").lower() == "true"
+CONTEXT_CACHE_TTL_MINUTES = int(os.environ.get("GEMINI_TUTOR_CONTEXT_CACHE_TTL_MINUTES", "60"))
+CONTEXT_CACHE_RETRY_SECONDS = 300  # Wait before retrying after a failed cache creation
+
+# Number of sessions whose assembled prompt prefix is kept per worker. Each prefix embeds the
+# ~200 KB system prompt, so this bounds the cache at roughly this many times 200 KB.
+PROMPT_PREFIX_CACHE_SIZE = int(os.environ.get("TUTOR_PROMPT_CACHE_SIZE", "32"))
+
+# Cap on the rendered history in the prompt, in characters (roughly 4 per token). The most recent
+# entries that fit are kept, on top of the MAX_HISTORY entry limit; 0 disables the budget.
+HISTORY_CHAR_BUDGET = int(os.environ.get("TUTOR_HISTORY_CHAR_BUDGET", "0"))
+
+# Number of replies kept per worker for byte-identical prompts, e.g. many students starting the
+# same problem (opt-in via TUTOR_RESPONSE_CACHE_SIZE; 0 disables the cache)
+RESPONSE_CACHE_SIZE = int(os.environ.get("TUTOR_RESPONSE_CACHE_SIZE", "0"))
+
+# Upper bound on concurrent in-flight Gemini calls made through the async API
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("GEMINI_TUTOR_MAX_CONCURRENCY", "32"))
+
+from app.services.tutor.session_storage import save_session, new_session_id
+from app.services.visual_generation.dsl_parser import DSLParser
 from app.services.validation.text_sanitizer import sanitize_tutor_message
+from app.utils.json_utils import JSONDecodeError, json_loads
 
 
 SYSTEM_PROMPT = """You are Math2Visual's AI tutor. You guide students through math word problems step by step.
@@ -2668,97 +2703,507 @@ Note: This is an example of what output to generate (using NEW_MWP token) when t
 """
 
 
-VISUAL_REQUEST_PATTERN = re.compile(r"VISUAL_REQUEST\s*=\s*({.*})", re.DOTALL)
+# The marker is located with str.find and the JSON payload is delimited by a
+# brace scanner, so long DSL scopes never cause regex backtracking.
+JSON_STRUCTURE_PATTERN = re.compile(r'[{}"\\]')
+VISUAL_REQUEST_SENTINEL = "VISUAL_REQUEST"
 MAX_HISTORY = 12  # Keep prompts bounded
+STREAM_FLUSH_INTERVAL = 0.03  # Seconds to coalesce small streamed deltas before forwarding them
+STREAM_FLUSH_CHARS = 256  # Forward coalesced deltas early once they reach this many characters
+ROLE_STUDENT = "student"  # History role values; module constants so every entry shares one string object
+ROLE_TUTOR = "tutor"
+ROLE_LABELS = {ROLE_STUDENT: "Student", ROLE_TUTOR: "Tutor"}  # Prompt labels per history role
+NUMERIC_ANSWER_PATTERN = re.compile(r"^\s*[$€]?\s*(-?\d+(?:[.,]\d+)?)\s*[$€]?\s*[.!]?\s*$")
 
 
-def _build_prompt(visual_language: str, history: List[Dict[str, str]], language: str) -> str:
-    history_lines = []
-    for h in history[-MAX_HISTORY:]:
-        role = h['role'].capitalize()
-        content = h['content']
-        # Include DSL scope from visual request if present
-        if h.get('visual_request') and h['visual_request'].get('dsl_scope'):
-            dsl_scope = h['visual_request']['dsl_scope']
-            history_lines.append(f"{role}: {content}\n[Visual DSL: {dsl_scope}]")
-        else:
-            history_lines.append(f"{role}: {content}")
-    history_text = "\n".join(history_lines)
-    
+@functools.lru_cache(maxsize=PROMPT_PREFIX_CACHE_SIZE)
+def _build_prompt_prefix(visual_language: str, language: str, include_system_prompt: bool = True) -> str:
+    """
+    Build the part of the prompt that is invariant for a session (system prompt,
+    language and DSL). Cached so the large system prompt and DSL block are only
+    assembled once per (visual_language, language) pair rather than every turn.
+    The system prompt is left out when the model already has it in a context cache.
+    """
     # Handle empty visual_language (for autostart sessions without MWP)
     visual_language_section = ""
     if visual_language and visual_language.strip():
         visual_language_section = f"visual_language:\n{visual_language}\n\n"
-    
-    prompt = (
-        f"{SYSTEM_PROMPT}\n\n"
+
+    system_prompt_section = f"{SYSTEM_PROMPT}\n\n" if include_system_prompt else ""
+
+    return (
+        f"{system_prompt_section}"
         f"Language: {language}\n"
         f"{visual_language_section}"
         "Conversation so far:\n"
-        f"{history_text}\n"
-        "Tutor:"
     )
-    return prompt
+
+
+def _history_entry_line(entry: Dict) -> str:
+    """Prompt line for one history entry, including the DSL scope of its visual request."""
+    role = entry['role']
+    label = ROLE_LABELS.get(role) or role.capitalize()
+    visual_request = entry.get('visual_request')
+    dsl_scope = visual_request.get('dsl_scope') if visual_request else None
+    # Include DSL scope from visual request if present
+    if dsl_scope:
+        return f"{label}: {entry['content']}\n[Visual DSL: {dsl_scope}]"
+    return f"{label}: {entry['content']}"
+
+
+def trim_history(history: List[Dict]) -> List[Dict]:
+    """Drop all but the last MAX_HISTORY entries in place and return the same list."""
+    del history[:-MAX_HISTORY]
+    return history
+
+
+def _fit_history_budget(history_lines: List[str]) -> List[str]:
+    """Keep the most recent lines whose combined length fits HISTORY_CHAR_BUDGET (always at least one)."""
+    total = 0
+    for i in range(len(history_lines) - 1, -1, -1):
+        total += len(history_lines[i]) + 1  # +1 for the joining newline
+        if total > HISTORY_CHAR_BUDGET and i < len(history_lines) - 1:
+            return history_lines[i + 1:]
+    return history_lines
+
+
+def _build_prompt(visual_language: str, history: List[Dict[str, str]], language: str,
+                  include_system_prompt: bool = True) -> str:
+    # Iterate the last MAX_HISTORY entries in place instead of copying them into a slice
+    history_lines = [_history_entry_line(h) for h in islice(history, max(len(history) - MAX_HISTORY, 0), None)]
+    if HISTORY_CHAR_BUDGET > 0:
+        history_lines = _fit_history_budget(history_lines)
+    history_text = "\n".join(history_lines)
+
+    return f"{_build_prompt_prefix(visual_language, language, include_system_prompt)}{history_text}\nTutor:"
+
+
+def _scan_json_object(text: str, pos: int) -> int:
+    """
+    Return the index just past the JSON object starting at text[pos] ("{"), or -1 if it is unbalanced.
+    Braces inside JSON strings are ignored; the scan is linear and never backtracks.
+    """
+    depth = 0
+    in_string = False
+    while True:
+        match = JSON_STRUCTURE_PATTERN.search(text, pos)
+        if not match:
+            return -1
+        char = match.group(0)
+        pos = match.end()
+        if in_string:
+            if char == "\\":
+                pos += 1  # Skip the escaped character
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _find_visual_request(text: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Locate the first well-formed VISUAL_REQUEST={...} marker in a single forward pass.
+    Returns (marker_start, json_start, json_end) or None.
+    """
+    idx = text.find(VISUAL_REQUEST_SENTINEL)
+    while idx != -1:
+        pos = _skip_whitespace(text, idx + len(VISUAL_REQUEST_SENTINEL))
+        if text.startswith("=", pos):
+            json_start = _skip_whitespace(text, pos + 1)
+            if text.startswith("{", json_start):
+                json_end = _scan_json_object(text, json_start)
+                if json_end != -1:
+                    return idx, json_start, json_end
+        idx = text.find(VISUAL_REQUEST_SENTINEL, idx + 1)
+    return None
 
 
 def _extract_visual_request(text: str) -> Tuple[str, Optional[Dict]]:
-    match = VISUAL_REQUEST_PATTERN.search(text)
-    if not match:
+    # Most replies carry no marker; skip the scan entirely for them
+    if VISUAL_REQUEST_SENTINEL not in text:
+        return sanitize_tutor_message(text.strip()), None
+
+    span = _find_visual_request(text)
+    if not span:
         return sanitize_tutor_message(text.strip()), None
 
-    raw_json = match.group(1)
+    marker_start, json_start, json_end = span
+    raw_json = text[json_start:json_end]
+    cleaned_text = (text[:marker_start] + text[json_end:]).strip()
     try:
-        parsed = json.loads(raw_json)
-    except json.JSONDecodeError:
+        parsed = json_loads(raw_json)
+    except JSONDecodeError:
         logger.warning("Failed to parse VISUAL_REQUEST JSON from tutor response.")
-        return sanitize_tutor_message(VISUAL_REQUEST_PATTERN.sub("", text).strip()), None
+        return sanitize_tutor_message(cleaned_text), None
 
-    cleaned_text = VISUAL_REQUEST_PATTERN.sub("", text).strip()
     return sanitize_tutor_message(cleaned_text), parsed
 
 
+_NO_VISUAL_REQUEST = object()  # Sentinel: no complete VISUAL_REQUEST payload in the text yet
+
+
+def _early_visual_request(text: str):
+    """
+    Parse the first complete VISUAL_REQUEST payload in a partial reply.
+    Returns _NO_VISUAL_REQUEST if none is complete yet, None if it is not valid JSON.
+    """
+    span = _find_visual_request(text)
+    if not span:
+        return _NO_VISUAL_REQUEST
+    _, json_start, json_end = span
+    try:
+        return json_loads(text[json_start:json_end])
+    except JSONDecodeError:
+        return None
+
+
+class _VisualRequestStreamFilter:
+    """
+    Incrementally removes VISUAL_REQUEST lines from streamed text deltas.
+
+    Text is forwarded as soon as it cannot be part of the sentinel; only a short tail
+    that may be the start of a sentinel split across chunks is held back. Once the
+    sentinel is seen, everything up to the end of that line is dropped.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._in_marker = False
+
+    def feed(self, delta: str) -> str:
+        self._pending += delta
+        out: List[str] = []
+        while self._pending:
+            if self._in_marker:
+                newline_idx = self._pending.find("\n")
+                if newline_idx == -1:
+                    self._pending = ""
+                    break
+                self._pending = self._pending[newline_idx + 1:]
+                self._in_marker = False
+                continue
+
+            marker_idx = self._pending.find(VISUAL_REQUEST_SENTINEL)
+            if marker_idx != -1:
+                out.append(self._pending[:marker_idx])
+                self._pending = self._pending[marker_idx + len(VISUAL_REQUEST_SENTINEL):]
+                self._in_marker = True
+                continue
+
+            # Hold back a trailing partial sentinel (e.g. "VISUAL_RE") until the next delta.
+            # The sentinel's first character occurs only once in it, so the only candidate
+            # is the suffix starting at the last such character in the tail; most deltas
+            # contain none and are forwarded whole.
+            keep = 0
+            tail_start = self._pending.rfind(
+                VISUAL_REQUEST_SENTINEL[0], max(len(self._pending) - len(VISUAL_REQUEST_SENTINEL) + 1, 0)
+            )
+            if tail_start != -1 and VISUAL_REQUEST_SENTINEL.startswith(self._pending[tail_start:]):
+                keep = len(self._pending) - tail_start
+            out.append(self._pending[:len(self._pending) - keep])
+            self._pending = self._pending[len(self._pending) - keep:]
+            break
+        return "".join(out)
+
+    def flush(self) -> str:
+        remaining = "" if self._in_marker else self._pending
+        self._pending = ""
+        return remaining
+
+
+# Shared model instance; GenerativeModel holds no per-request state
+_model_instance = None
+# Model bound to the SYSTEM_PROMPT context cache, and when to recreate it (time.monotonic())
+_cached_model = None
+_cached_model_renew_at = 0.0
+
+
+def _get_cached_model():
+    """
+    Return a model whose context is the server-side cached SYSTEM_PROMPT, or None if the
+    cache could not be created. The cache is recreated a minute before its TTL runs out.
+    """
+    global _cached_model, _cached_model_renew_at
+    now = time.monotonic()
+    if now >= _cached_model_renew_at:
+        ttl = datetime.timedelta(minutes=CONTEXT_CACHE_TTL_MINUTES)
+        try:
+            cache = caching.CachedContent.create(model=MODEL_NAME, system_instruction=SYSTEM_PROMPT, ttl=ttl)
+            _cached_model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+            _cached_model_renew_at = now + max(ttl.total_seconds() - 60, 60)
+        except Exception as e:
+            logger.warning(f"Could not create Gemini context cache, sending the full system prompt: {e}")
+            _cached_model = None
+            _cached_model_renew_at = now + CONTEXT_CACHE_RETRY_SECONDS
+    return _cached_model
+
+
+def _get_model():
+    """Get the shared Gemini model instance for MODEL_NAME (bound to the context cache if enabled)."""
+    global _model_instance
+    if CONTEXT_CACHE_ENABLED:
+        cached_model = _get_cached_model()
+        if cached_model is not None:
+            return cached_model
+    if _model_instance is None:
+        _model_instance = genai.GenerativeModel(MODEL_NAME)
+    return _model_instance
+
+
+def _response_text(response) -> str:
+    """Concatenate the text parts of all candidates in a non-streamed Gemini response."""
+    buffer = io.StringIO()
+    for candidate in getattr(response, "candidates", None) or []:
+        content = getattr(candidate, "content", None)
+        for part in getattr(content, "parts", []) or []:
+            text = getattr(part, "text", "") or ""
+            if text:
+                buffer.write(text)
+    return buffer.getvalue()
+
+
+def _chunk_text(chunk) -> str:
+    """
+    Return the text of a streamed Gemini chunk. The SDK's chunk.text accessor covers the
+    usual single-candidate chunk; it raises ValueError for chunks without text parts
+    (e.g. usage/finish metadata) or with several candidates, which take the generic walk.
+    """
+    try:
+        return chunk.text or ""
+    except (ValueError, AttributeError):
+        return _response_text(chunk)
+
+
+# prompt digest -> (full_text, visual_request), least recently used first
+_response_cache: "OrderedDict[bytes, Tuple[str, Optional[Dict]]]" = OrderedDict()
+
+
+def _response_cache_key(prompt: str) -> Optional[bytes]:
+    """Digest identifying a prompt in the response cache, or None when the cache is disabled."""
+    if RESPONSE_CACHE_SIZE <= 0:
+        return None
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+
+def _response_cache_get(key: Optional[bytes]) -> Optional[Tuple[str, Optional[Dict]]]:
+    if key is None:
+        return None
+    reply = _response_cache.get(key)
+    if reply is not None:
+        _response_cache.move_to_end(key)
+    return reply
+
+
+def _response_cache_put(key: Optional[bytes], reply: Tuple[str, Optional[Dict]]) -> None:
+    if key is None:
+        return
+    _response_cache[key] = reply
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+
+
+def _generate_tutor_reply(visual_language: str, history: List[Dict[str, str]], language: str) -> Tuple[str, Optional[Dict]]:
+    """
+    Generate a complete tutor reply in one non-streamed call; returns (full_text, visual_request).
+    Used where nothing is forwarded to the client before the reply is complete.
+    """
+    model = _get_model()
+    prompt = _build_prompt(visual_language, history, language, include_system_prompt=not model.cached_content)
+    cache_key = _response_cache_key(prompt)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    response = model.generate_content(prompt)
+    reply = _extract_visual_request(_response_text(response))
+    _response_cache_put(cache_key, reply)
+    return reply
+
+
 def _generate_tutor_reply_stream(visual_language: str, history: List[Dict[str, str]], language: str):
     """
     Stream tutor reply as chunks. Yields text deltas, returns (full_text, visual_request) at the end.
+    VISUAL_REQUEST lines are filtered out of the deltas while streaming; the final
+    payload is still extracted from the full text.
+    As soon as the first VISUAL_REQUEST payload is complete it is also yielded as
+    {"__visual_early__": True, "visual_request": ...} so the caller can start rendering
+    the visual while the rest of the reply streams in.
     """
-    model = genai.GenerativeModel(MODEL_NAME)
-    prompt = _build_prompt(visual_language, history, language)
+    model = _get_model()
+    prompt = _build_prompt(visual_language, history, language, include_system_prompt=not model.cached_content)
+    cache_key = _response_cache_key(prompt)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        final_text, visual_request = cached
+        yield final_text
+        yield {"__done__": True, "full_text": final_text, "visual_request": visual_request}
+        return
     stream = model.generate_content(prompt, stream=True)
 
-    parts_accum: List[str] = []
+    buffer = io.StringIO()
+    stream_filter = _VisualRequestStreamFilter()
+    visual_pending = True  # Until the first complete VISUAL_REQUEST payload has been seen
+    # Small deltas are coalesced so each SSE event carries more text
+    pending: List[str] = []
+    pending_chars = 0
+    last_flush = 0.0  # The first delta is forwarded immediately
     for chunk in stream:
-        # Gemini streaming emits candidates with parts; accumulate only text parts
-        if not chunk or not getattr(chunk, "candidates", None):
+        if not chunk:
             continue
-        for candidate in chunk.candidates:
-            content = getattr(candidate, "content", None)
-            part_list = getattr(content, "parts", []) or []
-            for part in part_list:
-                text = getattr(part, "text", "") or ""
-                if text:
-                    yield text
-                    parts_accum.append(text)
-
-    full_text = "".join(parts_accum)
-    final_text, visual_request = _extract_visual_request(full_text)
+        text = _chunk_text(chunk)
+        if text:
+            buffer.write(text)
+            visible = stream_filter.feed(text)
+            if visible:
+                pending.append(visible)
+                pending_chars += len(visible)
+                now = time.monotonic()
+                if pending_chars >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                    yield "".join(pending)
+                    pending.clear()
+                    pending_chars = 0
+                    last_flush = now
+            # A payload can only complete in a chunk that contains its closing brace
+            if visual_pending and "}" in text:
+                early_request = _early_visual_request(buffer.getvalue())
+                if early_request is not _NO_VISUAL_REQUEST:
+                    visual_pending = False
+                    if early_request is not None:
+                        if pending:
+                            yield "".join(pending)
+                            pending.clear()
+                            pending_chars = 0
+                            last_flush = time.monotonic()
+                        yield {"__visual_early__": True, "visual_request": early_request}
+
+    pending.append(stream_filter.flush())
+    tail = "".join(pending)
+    if tail:
+        yield tail
+
+    final_text, visual_request = _extract_visual_request(buffer.getvalue())
+    _response_cache_put(cache_key, (final_text, visual_request))
     yield {"__done__": True, "full_text": final_text, "visual_request": visual_request}
 
 
+def _parse_numeric_answer(text: str) -> Optional[float]:
+    """Return the number if the message is only a number (optionally with a currency sign), else None."""
+    match = NUMERIC_ANSWER_PATTERN.match(text or "")
+    if not match:
+        return None
+    return float(match.group(1).replace(",", "."))
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_final_quantity(visual_language: str) -> Optional[float]:
+    """
+    Return the entity_quantity of the top-level result_container, or None if there is none.
+    A session keeps the same visual_language across turns, so keying the cache on the DSL
+    text parses it once per session and per worker instead of once per message.
+    """
+    if not visual_language or not visual_language.strip():
+        return None
+    try:
+        parsed = DSLParser().parse_dsl(visual_language)
+    except ValueError:
+        return None
+    result_container = parsed.get("result_container") or {}
+    return result_container.get("item", {}).get("entity_quantity")
+
+
+def _asks_for_final_result(history: List[Dict], visual_language: str) -> bool:
+    """
+    Check whether the tutor's last turn is about the whole problem, i.e. its visual request
+    covers the full DSL. Earlier turns ask about sub-steps whose answers may coincide with
+    the final quantity, so a matching number there does not mean the problem is solved.
+    """
+    last_tutor = next((h for h in reversed(history) if h.get("role") == ROLE_TUTOR), None)
+    visual_request = (last_tutor or {}).get("visual_request") or {}
+    dsl_scope = visual_request.get("dsl_scope") or ""
+    return bool(dsl_scope) and dsl_scope.split() == visual_language.split()
+
+
+def is_final_answer(student_message: str, visual_language: str, history: List[Dict]) -> bool:
+    """
+    Check whether the student's message is just the final numeric answer of the problem,
+    given while the tutor's open question is about the whole problem.
+    Used to skip the Gemini round-trip on the common happy-path turn.
+    """
+    if not _asks_for_final_result(history, visual_language):
+        return False
+    answer = _parse_numeric_answer(student_message)
+    if answer is None:
+        return False
+    expected = _get_final_quantity(visual_language)
+    if expected is None:
+        return False
+    return math.isclose(answer, expected, rel_tol=1e-9, abs_tol=1e-6)
+
+
+# One semaphore per event loop: an asyncio.Semaphore binds to the first loop that waits on it,
+# so a single module-level one breaks callers that run the API from another loop (e.g. a
+# second asyncio.run()). Weak keys drop the semaphore once its loop is gone.
+_request_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _get_request_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent Gemini calls on the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _request_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _request_semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return semaphore
+
+
+async def generate_tutor_reply_async(visual_language: str, history: List[Dict[str, str]], language: str) -> Tuple[str, Optional[Dict]]:
+    """
+    Generate a complete tutor reply without blocking the event loop.
+    Concurrent callers are bounded by MAX_CONCURRENT_REQUESTS; returns (full_text, visual_request).
+    """
+    model = _get_model()
+    prompt = _build_prompt(visual_language, history, language, include_system_prompt=not model.cached_content)
+    cache_key = _response_cache_key(prompt)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    async with _get_request_semaphore():
+        response = await model.generate_content_async(prompt)
+
+    reply = _extract_visual_request(_response_text(response))
+    _response_cache_put(cache_key, reply)
+    return reply
+
+
+async def generate_tutor_replies(requests: List[Tuple[str, List[Dict[str, str]], str]]) -> List[Tuple[str, Optional[Dict]]]:
+    """
+    Generate tutor replies for several independent (visual_language, history, language) turns concurrently.
+    Results are returned in the same order as the requests.
+    """
+    return await asyncio.gather(
+        *(generate_tutor_reply_async(vl, hist, lang) for vl, hist, lang in requests)
+    )
+
+
 def start_tutor_session(mwp: str, visual_language: str, language: str = "en") -> Tuple[str, str, Optional[Dict]]:
-    session_id = str(uuid.uuid4())
-    history: List[Dict[str, str]] = [{"role": "student", "content": mwp}]
-
-    # Use streaming version for consistency with message/stream endpoint
-    # Collect all chunks and wait for the final result
-    tutor_reply = ""
-    visual_request = None
-    for chunk in _generate_tutor_reply_stream(visual_language, history, language):
-        if isinstance(chunk, dict) and chunk.get("__done__"):
-            tutor_reply = chunk.get("full_text", "")
-            visual_request = chunk.get("visual_request")
-            break
-    
-    tutor_entry = {"role": "tutor", "content": tutor_reply}
+    session_id = new_session_id()
+    history: List[Dict[str, str]] = [{"role": ROLE_STUDENT, "content": mwp}]
+
+    # Nothing is streamed to the client here, so request the reply in one piece
+    tutor_reply, visual_request = _generate_tutor_reply(visual_language, history, language)
+
+    tutor_entry = {"role": ROLE_TUTOR, "content": tutor_reply}
     if visual_request:
         tutor_entry["visual_request"] = visual_request
     history.append(tutor_entry)
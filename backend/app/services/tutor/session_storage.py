@@ -5,14 +5,80 @@ across all Gunicorn workers and survive process restarts.
 """
 import logging
 import os
+import random
+import secrets
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+
+from app.config.database import db_session, is_analytics_enabled
+from app.models.tutor_session import TutorSession
 
 logger = logging.getLogger(__name__)
 
 # Session expiration (hours of inactivity), configurable via environment.
 # Defaults to 2 hours if TUTOR_SESSION_EXPIRATION_HOURS is not set.
 SESSION_EXPIRATION_HOURS = float(os.getenv("TUTOR_SESSION_EXPIRATION_HOURS", "2"))
+SESSION_EXPIRATION = timedelta(hours=SESSION_EXPIRATION_HOURS)
+
+# Reads only bump last_activity once it is older than this many seconds, so most reads
+# skip the UPDATE + COMMIT. Expiration may therefore be measured up to this much early.
+SESSION_ACTIVITY_REFRESH_SECONDS = float(os.getenv("TUTOR_SESSION_ACTIVITY_REFRESH_SECONDS", "300"))
+SESSION_ACTIVITY_REFRESH = timedelta(seconds=SESSION_ACTIVITY_REFRESH_SECONDS)
+
+# Share of saves that also delete a small batch of expired sessions, so expired rows are
+# purged continuously without relying on the cleanup script. 0 disables it.
+SESSION_CLEANUP_PROBABILITY = float(os.getenv("TUTOR_SESSION_CLEANUP_PROBABILITY", "0.01"))
+SESSION_CLEANUP_BATCH_SIZE = 100  # Max rows removed by one opportunistic cleanup
+CLEANUP_BATCH_SIZE = 1000  # Rows per transaction in cleanup_expired_sessions
+
+
+def new_session_id() -> str:
+    """Return a new random, URL-safe session ID (22 characters, 128 bits of entropy)."""
+    return secrets.token_urlsafe(16)
+
+
+def _upsert_insert(db):
+    """Return the dialect's insert() supporting ON CONFLICT, or None if the backend has no upsert."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def _delete_expired_batch(db, limit: int) -> int:
+    """Delete up to limit of the longest-idle expired sessions and commit; returns the number deleted."""
+    expiration_time = datetime.now(timezone.utc) - SESSION_EXPIRATION
+    expired_ids = (
+        select(TutorSession.session_id)
+        .where(TutorSession.last_activity < expiration_time)
+        .order_by(TutorSession.last_activity)
+        .limit(limit)
+        # PostgreSQL: skip rows another worker is already deleting (not rendered on SQLite)
+        .with_for_update(skip_locked=True)
+    )
+    result = db.execute(delete(TutorSession).where(TutorSession.session_id.in_(expired_ids)))
+    db.commit()
+    return result.rowcount or 0
+
+
+def _maybe_cleanup_expired(db) -> None:
+    """With probability SESSION_CLEANUP_PROBABILITY, delete one bounded batch of expired sessions."""
+    if SESSION_CLEANUP_PROBABILITY <= 0 or random.random() >= SESSION_CLEANUP_PROBABILITY:
+        return
+    if is_analytics_enabled():
+        return
+    try:
+        deleted = _delete_expired_batch(db, SESSION_CLEANUP_BATCH_SIZE)
+        if deleted:
+            logger.debug(f"Deleted {deleted} expired tutor session(s)")
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Error cleaning up expired sessions: {e}")
 
 
 def get_session(session_id: str) -> Optional[Dict]:
@@ -22,25 +88,25 @@ def get_session(session_id: str) -> Optional[Dict]:
     When analytics is enabled, sessions never expire and are not deleted.
     """
     try:
-        from app.config.database import db_session
-        from app.models.tutor_session import TutorSession
-        
         with db_session() as db:
-            session = db.query(TutorSession).filter_by(session_id=session_id).first()
+            now = datetime.now(timezone.utc)
+            stmt = select(TutorSession).where(TutorSession.session_id == session_id)
+            # Filter expired sessions in the query; they are left for the expired-session cleanup to delete
+            if not is_analytics_enabled():
+                stmt = stmt.where(TutorSession.last_activity >= now - SESSION_EXPIRATION)
+            session = db.scalars(stmt).first()
             if not session:
                 return None
             
-            # Check expiration - is_expired() already returns False when analytics is enabled
-            if session.is_expired():
-                db.delete(session)
+            # Build the result before any commit, which would expire the loaded attributes
+            result = session.to_dict()
+
+            # Update last activity only when it is stale; saves on every turn refresh it anyway
+            if not session.last_activity or now - session.last_activity > SESSION_ACTIVITY_REFRESH:
+                session.last_activity = now
                 db.commit()
-                return None
-            
-            # Update last activity
-            session.last_activity = datetime.now(timezone.utc)
-            db.commit()
             
-            return session.to_dict()
+            return result
     except Exception as e:
         logger.error(f"Error getting session from database: {e}.")
         return None
@@ -52,13 +118,34 @@ def save_session(session_id: str, visual_language: str, history: List[Dict], met
     metadata: Optional dictionary for additional session data (e.g., preferred_variant)
     """
     try:
-        from app.config.database import db_session
-        from app.models.tutor_session import TutorSession
-        
         with db_session() as db:
-            session = db.query(TutorSession).filter_by(session_id=session_id).first()
             now = datetime.now(timezone.utc)
-            
+
+            # Common case (every turn): create-or-update in one round-trip, keeping stored metadata
+            insert = None if metadata else _upsert_insert(db)
+            if insert is not None:
+                stmt = insert(TutorSession).values(
+                    session_id=session_id,
+                    visual_language=visual_language,
+                    history=history,
+                    session_metadata={},
+                    created_at=now,
+                    last_activity=now,
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[TutorSession.session_id],
+                    set_={
+                        "visual_language": stmt.excluded.visual_language,
+                        "history": stmt.excluded.history,
+                        "last_activity": stmt.excluded.last_activity,
+                    },
+                )
+                db.execute(stmt)
+                db.commit()
+                _maybe_cleanup_expired(db)
+                return
+
+            session = db.get(TutorSession, session_id)
             if session:
                 # Update existing session
                 session.visual_language = visual_language
@@ -82,21 +169,32 @@ def save_session(session_id: str, visual_language: str, history: List[Dict], met
                 db.add(session)
             
             db.commit()
+            _maybe_cleanup_expired(db)
     except Exception as e:
         logger.error(f"Error saving session to database: {e}.")
 
 
-def delete_session(session_id: str) -> None:
-    """Delete a tutor session."""
+def update_session_metadata(session_id: str, metadata: Dict) -> None:
+    """Merge metadata into an existing session without rewriting its history. No-op if it does not exist."""
     try:
-        from app.config.database import db_session
-        from app.models.tutor_session import TutorSession
-        
         with db_session() as db:
-            session = db.query(TutorSession).filter_by(session_id=session_id).first()
+            session = db.get(TutorSession, session_id)
             if session:
-                db.delete(session)
+                current_metadata = dict(session.session_metadata or {})
+                current_metadata.update(metadata)
+                session.session_metadata = current_metadata
                 db.commit()
+    except Exception as e:
+        logger.error(f"Error updating session metadata in database: {e}.")
+
+
+def delete_session(session_id: str) -> None:
+    """Delete a tutor session."""
+    try:
+        with db_session() as db:
+            # Delete by key without loading the row first
+            db.execute(delete(TutorSession).where(TutorSession.session_id == session_id))
+            db.commit()
     except Exception as e:
         logger.error(f"Error deleting session from database: {e}.")
 
@@ -107,29 +205,20 @@ def cleanup_expired_sessions() -> int:
     Returns the number of sessions deleted.
     When analytics is enabled, no sessions are deleted (returns 0).
     """
-    from app.config.database import is_analytics_enabled
-    
     # Skip cleanup if analytics is enabled
     if is_analytics_enabled():
         logger.debug("Analytics is enabled, skipping session cleanup")
         return 0
     
     try:
-        from app.config.database import db_session
-        from app.models.tutor_session import TutorSession
-        
         with db_session() as db:
-            expiration_time = datetime.now(timezone.utc) - timedelta(hours=SESSION_EXPIRATION_HOURS)
-            expired_sessions = db.query(TutorSession).filter(
-                TutorSession.last_activity < expiration_time
-            ).all()
-            
-            count = len(expired_sessions)
-            for session in expired_sessions:
-                db.delete(session)
-            
-            db.commit()
-            return count
+            # Delete in bounded batches (one short transaction each) instead of loading every row
+            count = 0
+            while True:
+                deleted = _delete_expired_batch(db, CLEANUP_BATCH_SIZE)
+                count += deleted
+                if deleted < CLEANUP_BATCH_SIZE:
+                    return count
     except Exception as e:
         logger.error(f"Error cleaning up expired sessions: {e}")
         return 0
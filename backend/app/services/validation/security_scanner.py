@@ -5,9 +5,13 @@ This module provides virus scanning capabilities using ClamAV daemon (clamd)
 with graceful fallback when ClamAV is not available or configured.
 """
 
+import hashlib
 import logging
 import tempfile
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import Tuple, Optional
 from dataclasses import dataclass
 
@@ -21,6 +25,23 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# How long an availability probe result is trusted before clamd is pinged again.
+# Failures are re-probed sooner so scanning resumes quickly after clamd (re)starts.
+AVAILABILITY_TTL_SECONDS = 30
+UNAVAILABILITY_TTL_SECONDS = 5
+
+# Common ClamAV socket paths, tried when no socket path is configured
+CLAMAV_SOCKET_PATHS = (
+    '/var/run/clamav/clamd.ctl',  # Debian/Ubuntu
+    '/var/run/clamd.scan/clamd.sock',  # CentOS/RHEL
+    '/tmp/clamd.socket',  # Custom/development
+)
+
+# Results of completed scans, keyed by content digest, so identical uploads are not rescanned.
+# Entries expire so that content is rescanned against updated signature databases.
+SCAN_CACHE_SIZE = 1024
+SCAN_CACHE_TTL_SECONDS = 3600
+
 
 @dataclass
 class ScanResult:
@@ -47,7 +68,7 @@ class ClamAVScanner:
         Initialize ClamAV scanner.
         
         Args:
-            socket_path: Path to ClamAV unix socket (preferred)
+            socket_path: Path to ClamAV unix socket (preferred; common paths are tried if None)
             host: ClamAV daemon host (fallback)
             port: ClamAV daemon port (fallback)
         """
@@ -55,33 +76,46 @@ class ClamAVScanner:
         self.host = host
         self.port = port
         self._connection = None
-        self._availability_checked = False
+        self._availability_expires_at = 0.0  # time.monotonic() until which _is_available is trusted
         self._is_available = False
         self._last_error = None
-        self._using_network_socket = False  # Track if we're using network vs Unix socket
+        self._using_network_socket = socket_path is None  # Track if we're using network vs Unix socket
+        self._active_socket_path = socket_path  # Configured or discovered Unix socket in use
     
     def _check_availability(self) -> bool:
         """
         Check if ClamAV is available and accessible.
         
+        The result is cached for AVAILABILITY_TTL_SECONDS (UNAVAILABILITY_TTL_SECONDS
+        after a failure), so a restarted or newly started daemon is picked up.
+        
         Returns:
             True if ClamAV is available, False otherwise
         """
-        if self._availability_checked:
+        now = time.monotonic()
+        if now < self._availability_expires_at:
             return self._is_available
         
-        self._availability_checked = True
-        
         if not PYCLAMD_AVAILABLE:
+            # Cannot change at runtime, so never re-probe
+            self._availability_expires_at = float('inf')
             self._last_error = "pyclamd library not installed"
             logger.info("ClamAV not available: pyclamd library not installed")
             return False
         
+        was_available = self._is_available
+        previous_error = self._last_error
+        self._is_available = False
+        self._availability_expires_at = now + UNAVAILABILITY_TTL_SECONDS
         try:
+            # Look for the local socket on every probe, so a daemon started after us is found
+            socket_path = self.socket_path or next((p for p in CLAMAV_SOCKET_PATHS if os.path.exists(p)), None)
+            
             # Try to create connection
-            if self.socket_path and os.path.exists(self.socket_path):
-                cd = pyclamd.ClamdUnixSocket(self.socket_path)
+            if socket_path and os.path.exists(socket_path):
+                cd = pyclamd.ClamdUnixSocket(socket_path)
                 self._using_network_socket = False
+                self._active_socket_path = socket_path
             else:
                 cd = pyclamd.ClamdNetworkSocket(self.host, self.port)
                 self._using_network_socket = True
@@ -90,17 +124,26 @@ class ClamAVScanner:
             if cd.ping():
                 self._connection = cd
                 self._is_available = True
-                logger.info(f"ClamAV available at {self.socket_path or f'{self.host}:{self.port}'}")
+                self._last_error = None
+                self._availability_expires_at = now + AVAILABILITY_TTL_SECONDS
+                if not was_available:
+                    logger.info(f"ClamAV available at {self._connection_target()}")
                 return True
             else:
                 self._last_error = "ClamAV daemon not responding to ping"
-                logger.warning("ClamAV daemon not responding to ping")
-                return False
-                
         except Exception as e:
             self._last_error = f"Failed to connect to ClamAV: {str(e)}"
-            logger.warning(f"ClamAV not available: {str(e)}")
-            return False
+        
+        # Only log state changes; an absent daemon is re-probed every few seconds
+        if was_available or self._last_error != previous_error:
+            logger.warning(f"ClamAV not available: {self._last_error}")
+        return False
+    
+    def _connection_target(self) -> str:
+        """Return the socket path or host:port of the current (or last attempted) connection."""
+        if self._using_network_socket:
+            return f'{self.host}:{self.port}'
+        return self._active_socket_path
     
     def get_version_info(self) -> Optional[str]:
         """
@@ -125,7 +168,7 @@ class ClamAVScanner:
         Args:
             scan_result: Result from scan_stream() or scan_file()
             filename_hint: Filename for logging
-            file_path: File path (for file scan results, None for stream scan)
+            file_path: Key of the result dict (the file path for file scans, "stream" for stream scans)
             
         Returns:
             ScanResult with scan details
@@ -159,12 +202,42 @@ class ClamAVScanner:
             error_message=f"Unexpected scan result format: {scan_result}"
         )
     
+    def _scan_temp_file(self, content: bytes, filename_hint: str) -> ScanResult:
+        """
+        Scan content by writing it to a temporary file that clamd reads directly.
+        
+        Only works when ClamAV runs on the same host (Unix socket); used for
+        payloads larger than clamd's StreamMaxLength.
+        
+        Args:
+            content: File content as bytes
+            filename_hint: Filename for logging purposes
+            
+        Returns:
+            ScanResult with scan details
+        """
+        with tempfile.NamedTemporaryFile(delete=False, dir='/tmp', prefix='clamav_scan_') as temp_file:
+            temp_file.write(content)
+            temp_file.flush()
+            temp_path = temp_file.name
+        
+        os.chmod(temp_path, 0o644)
+        try:
+            scan_result = self._connection.scan_file(temp_path)
+            return self._process_scan_result(scan_result, filename_hint, temp_path)
+        finally:
+            try:
+                os.unlink(temp_path)
+            except Exception:
+                pass
+    
     def scan_content(self, content: bytes, filename_hint: str = "unknown") -> ScanResult:
         """
         Scan file content for viruses.
         
-        Uses stream scanning when ClamAV is accessed over network (Docker containers),
-        falls back to file scanning when using Unix socket (same host).
+        Streams the content to clamd (INSTREAM) over either socket type, so no
+        temporary file is written. Content exceeding clamd's stream size limit
+        falls back to file scanning when using a Unix socket (same host).
         
         Args:
             content: File content as bytes
@@ -181,30 +254,21 @@ class ClamAVScanner:
                 error_message=self._last_error
             )
         
+        scan_type = "stream"
         try:
-            if self._using_network_socket:
-                # Stream scanning: send content directly over network (works across containers)
+            try:
                 scan_result = self._connection.scan_stream(content)
-                return self._process_scan_result(scan_result, filename_hint)
-            else:
-                # File scanning: use temporary file (works when ClamAV is on same host)
-                with tempfile.NamedTemporaryFile(delete=False, dir='/tmp', prefix='clamav_scan_') as temp_file:
-                    temp_file.write(content)
-                    temp_file.flush()
-                    temp_path = temp_file.name
-                
-                os.chmod(temp_path, 0o644)
-                try:
-                    scan_result = self._connection.scan_file(temp_path)
-                    return self._process_scan_result(scan_result, filename_hint, temp_path)
-                finally:
-                    try:
-                        os.unlink(temp_path)
-                    except Exception:
-                        pass
+                # pyclamd reports stream results as {'stream': (status, threat_name)}
+                return self._process_scan_result(scan_result, filename_hint, "stream")
+            except pyclamd.BufferTooLongError:
+                if self._using_network_socket:
+                    raise
+                scan_type = "file"
+                return self._scan_temp_file(content, filename_hint)
         except Exception as e:
-            scan_type = "stream" if self._using_network_socket else "file"
             logger.error(f"Error during ClamAV {scan_type} scan of {filename_hint}: {str(e)}")
+            # The daemon may have gone away; ping it again before the next scan
+            self._availability_expires_at = 0.0
             return ScanResult(
                 is_clean=True,
                 scan_performed=False,
@@ -224,8 +288,8 @@ class ClamAVScanner:
         status = {
             'scanner_available': is_available,
             'pyclamd_installed': PYCLAMD_AVAILABLE,
-            'connection_method': 'socket' if self.socket_path else 'network',
-            'connection_target': self.socket_path or f'{self.host}:{self.port}'
+            'connection_method': 'network' if self._using_network_socket else 'socket',
+            'connection_target': self._connection_target()
         }
         
         if not is_available:
@@ -241,6 +305,9 @@ class ClamAVScanner:
 # Global scanner instance with common configurations
 _scanner_instance = None
 
+_scan_cache: "OrderedDict[bytes, Tuple[float, ScanResult]]" = OrderedDict()
+_scan_cache_lock = threading.Lock()
+
 def get_clamav_scanner() -> ClamAVScanner:
     """
     Get shared ClamAV scanner instance.
@@ -251,19 +318,7 @@ def get_clamav_scanner() -> ClamAVScanner:
     global _scanner_instance
     
     if _scanner_instance is None:
-        # Try common ClamAV socket paths
-        socket_paths = [
-            '/var/run/clamav/clamd.ctl',  # Debian/Ubuntu
-            '/var/run/clamd.scan/clamd.sock',  # CentOS/RHEL
-            '/tmp/clamd.socket',  # Custom/development
-        ]
-        
-        socket_path = None
-        for path in socket_paths:
-            if os.path.exists(path):
-                socket_path = path
-                break
-        
+        # Socket paths are discovered by the scanner when it first probes the daemon
         # Allow overriding host/port via environment variables (useful in Docker)
         clamav_host = os.getenv("CLAMAV_HOST", "localhost")
         try:
@@ -272,7 +327,6 @@ def get_clamav_scanner() -> ClamAVScanner:
             clamav_port = 3310
 
         _scanner_instance = ClamAVScanner(
-            socket_path=socket_path,
             host=clamav_host,
             port=clamav_port,
         )
@@ -284,6 +338,8 @@ def scan_file_content(content: bytes, filename: str = "unknown") -> ScanResult:
     """
     Convenience function to scan file content.
     
+    Results for content that was already scanned recently are reused.
+    
     Args:
         content: File content as bytes
         filename: Filename for logging
@@ -291,8 +347,26 @@ def scan_file_content(content: bytes, filename: str = "unknown") -> ScanResult:
     Returns:
         ScanResult
     """
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    now = time.monotonic()
+    with _scan_cache_lock:
+        cached = _scan_cache.get(digest)
+        if cached and cached[0] > now:
+            _scan_cache.move_to_end(digest)
+            logger.debug(f"Reusing cached scan result for {filename}")
+            return cached[1]
+    
     scanner = get_clamav_scanner()
-    return scanner.scan_content(content, filename)
+    result = scanner.scan_content(content, filename)
+    
+    # Only cache real scan outcomes; skipped or failed scans should be retried
+    if result.scan_performed:
+        with _scan_cache_lock:
+            _scan_cache[digest] = (now + SCAN_CACHE_TTL_SECONDS, result)
+            _scan_cache.move_to_end(digest)
+            while len(_scan_cache) > SCAN_CACHE_SIZE:
+                _scan_cache.popitem(last=False)
+    return result
 
 
 def is_clamav_available() -> bool:
@@ -6,12 +6,26 @@ Uses bleach library to clean HTML while preserving safe formatting.
 """
 
 import logging
+import re
 from typing import Optional
 
 import nh3
 
 logger = logging.getLogger(__name__)
 
+# Strip-everything configuration, built once instead of on every call
+_EMPTY_TAGS = frozenset()
+try:
+    _clean = nh3.Cleaner(tags=_EMPTY_TAGS).clean
+except AttributeError:
+    # nh3 < 0.3 has no Cleaner
+    def _clean(text: str) -> str:
+        return nh3.clean(text, tags=_EMPTY_TAGS)
+
+# Characters nh3 may change in plain text (markup, entities, NUL, CR, NBSP, BOM).
+# Text containing none of them is returned unchanged without calling into nh3.
+_NEEDS_CLEANING = re.compile(r"[<>&\x00\r\xa0\ufeff]")
+
 
 def sanitize_tutor_message(text: str) -> str:
     """
@@ -27,14 +41,14 @@ def sanitize_tutor_message(text: str) -> str:
     Returns:
         Sanitized tutor message (HTML stripped)
     """
-    if not text:
+    if not text or not _NEEDS_CLEANING.search(text):
         return text
 
     try:
         # For tutor messages, we want to completely strip all HTML tags and their content
         # This is more secure than just stripping tags and keeping inner content
         # nh3.clean with empty tags set strips all HTML (equivalent to bleach with tags=[], strip=True)
-        return nh3.clean(text, tags=set())
+        return _clean(text)
     except Exception as e:
         logger.error(f"Error during tutor message sanitization: {str(e)}")
         # Fallback: return original text if sanitization fails
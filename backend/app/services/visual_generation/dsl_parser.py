@@ -1,4 +1,64 @@
 import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+# DSL grammar patterns, compiled once at import instead of being looked up per token
+ENTITY_PATTERN = re.compile(r"(\w+)\[(.*?)\]")
+BARE_ENTITY_PATTERN = re.compile(r"^\w+\s*\[.*\]$")
+FUNC_PATTERN = re.compile(r"(\w+)\s*\((.*)\)")
+
+# Field names and the values of icon/type tag fields repeat heavily and are used as dict keys
+# and in equality checks by the generators, so they are interned as they leave the parser
+TAG_FIELDS = frozenset({"entity_type", "container_type", "attr_type"})
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedEntity:
+    """Compact, immutable record of a parsed entity token, used as the cache value."""
+    name: str
+    item: Tuple[Tuple[str, float | str], ...]
+    attributes: Tuple[Tuple[str, str], ...]
+
+    @property
+    def is_result(self) -> bool:
+        return self.name == "result_container"
+
+    def to_dict(self) -> dict:
+        """Materialize the mutable dict layout consumed by the visual generators."""
+        entity_dict = {"name": self.name, "item": dict(self.item)}
+        entity_dict.update(self.attributes)
+        return entity_dict
+
+
+@lru_cache(maxsize=1024)
+def _parse_entity_token_cached(entity: str) -> ParsedEntity:
+    """Parse an entity token once into an immutable ParsedEntity."""
+    entity_match = ENTITY_PATTERN.match(entity)
+    if not entity_match:
+        raise ValueError(f"Entity format is incorrect: {entity}")
+    entity_name, entity_content = entity_match.groups()
+    parts = [p.strip() for p in entity_content.split(',')]
+    item = {}
+    attributes = {}
+    for part in parts:
+        if ':' in part:
+            key, val = part.split(':', 1)
+            key, val = sys.intern(key.strip()), val.strip()
+            if key == "entity_quantity":
+                try:
+                    item["entity_quantity"] = float(val)
+                except ValueError:
+                    item["entity_quantity"] = 0.0  # Default to 0.0 if conversion fails
+            elif key == "entity_type":
+                item["entity_type"] = sys.intern(val)
+            elif key in TAG_FIELDS:
+                attributes[key] = sys.intern(val)
+            else:
+                attributes[key] = val
+
+    return ParsedEntity(name=sys.intern(entity_name), item=tuple(item.items()), attributes=tuple(attributes.items()))
 
 
 class DSLParser:
@@ -11,6 +71,7 @@ class DSLParser:
     
     def __init__(self):
         self.operations_list = ["addition", "subtraction", "multiplication", "division", "surplus", "unittrans", "area", "comparison", "identity"]
+        self._operation_prefixes = tuple(self.operations_list)
     
     def parse_dsl(self, dsl_str):
         """
@@ -28,8 +89,7 @@ class DSLParser:
         cleaned = " ".join(dsl_str.strip().split())
 
         # Accept a bare entity as an identity operation (single-container visualization)
-        bare_entity_pattern = r"^\w+\s*\[.*\]$"
-        if re.match(bare_entity_pattern, cleaned):
+        if BARE_ENTITY_PATTERN.match(cleaned):
             entity_dict, is_result = self._parse_entity_token(cleaned)
             result = {"operation": "identity", "entities": []}
             if is_result:
@@ -46,29 +106,13 @@ class DSLParser:
     def _parse_entity_token(self, entity: str):
         """
         Parse an entity token like `container1[...]` into a dict.
-        """
-        entity_pattern = r"(\w+)\[(.*?)\]"
-        entity_match = re.match(entity_pattern, entity)
-        if not entity_match:
-            raise ValueError(f"Entity format is incorrect: {entity}")
-        entity_name, entity_content = entity_match.groups()
-        parts = [p.strip() for p in entity_content.split(',')]
-        entity_dict = {"name": entity_name, "item": {}}
-        for part in parts:
-            if ':' in part:
-                key, val = part.split(':', 1)
-                key, val = key.strip(), val.strip()
-                if key == "entity_quantity":
-                    try:
-                        entity_dict["item"]["entity_quantity"] = float(val)
-                    except ValueError:
-                        entity_dict["item"]["entity_quantity"] = 0.0  # Default to 0.0 if conversion fails
-                elif key == "entity_type":
-                    entity_dict["item"]["entity_type"] = val
-                else:
-                    entity_dict[key] = val
 
-        return entity_dict, entity_name == "result_container"
+        Identical tokens (the same container appears in every DSL snippet the tutor
+        requests) are parsed once and shared through a module-level cache; callers
+        always receive a fresh copy because the generators mutate entities in place.
+        """
+        parsed = _parse_entity_token_cached(entity)
+        return parsed.to_dict(), parsed.is_result
     
     def _split_entities(self, inside_str):
         """
@@ -83,9 +127,10 @@ class DSLParser:
         entities = []
         balance_paren = 0
         balance_bracket = 0
-        buffer = ""
+        start = 0
 
-        for char in inside_str:
+        # Track split positions and slice once per entity instead of growing a buffer per character
+        for idx, char in enumerate(inside_str):
             if char == "(":
                 balance_paren += 1
             elif char == ")":
@@ -94,15 +139,12 @@ class DSLParser:
                 balance_bracket += 1
             elif char == "]":
                 balance_bracket -= 1
+            elif char == "," and balance_paren == 0 and balance_bracket == 0:
+                entities.append(inside_str[start:idx].strip())
+                start = idx + 1
 
-            if char == "," and balance_paren == 0 and balance_bracket == 0:
-                entities.append(buffer.strip())
-                buffer = ""
-            else:
-                buffer += char
-
-        if buffer:
-            entities.append(buffer.strip())
+        if start < len(inside_str):
+            entities.append(inside_str[start:].strip())
 
         return entities
     
@@ -111,7 +153,7 @@ class DSLParser:
         Recursively parses operations and entities.
         
         Args:
-            input_str (str): The DSL string to parse
+            input_str (str): The DSL string to parse, already whitespace-normalized by parse_dsl
             
         Returns:
             dict: Structured data with operation, entities, and result_container
@@ -119,20 +161,19 @@ class DSLParser:
         Raises:
             ValueError: If the DSL format is invalid
         """
-        input_str = " ".join(input_str.strip().split())  # Clean spaces
-        func_pattern = r"(\w+)\s*\((.*)\)"
-        match = re.match(func_pattern, input_str)
+        match = FUNC_PATTERN.match(input_str)
 
         if not match:
             raise ValueError(f"DSL does not match the expected pattern: {input_str}")
 
         operation, inside = match.groups()  # Extract operation and content
+        operation = sys.intern(operation)
         parsed_entities = []
         result_container = None
 
         # Safely split entities
         for entity in self._split_entities(inside):
-            if any(entity.startswith(op) for op in self.operations_list):
+            if entity.startswith(self._operation_prefixes):
                 # Recognize and recurse into nested operations
                 parsed_entities.append(self._recursive_parse(entity))
             else:
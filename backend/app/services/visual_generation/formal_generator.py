@@ -8,6 +8,7 @@ import inflect
 import re
 import logging
 from app.services.visual_generation.container_type_utils import update_container_types_optimized
+from app.services.visual_generation.svg_resources import SVG_PRETTY, SVGResourceCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class FormalVisualGenerator:
         self.error_message = ""
         self._missing_svg_entities = []
         self._svg_directory_cache = {}
+        self._svg_resources = SVGResourceCache()
         self.p = inflect.engine()
         self._translate = translate if translate else lambda msg, **kwargs: msg
 
@@ -731,8 +733,8 @@ class FormalVisualGenerator:
 
         
             def embed_svg(file_path, x, y, width, height):
-                if not os.path.exists(file_path):
-                    logger.debug(f"SVG file not found: {file_path}")
+                if not self._svg_resources.exists(file_path):
+                    logger.debug("SVG file not found: %s", file_path)
                     # Get the directory and base name from the file_path
                     dir_path = os.path.dirname(file_path)
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -796,9 +798,8 @@ class FormalVisualGenerator:
                         self.error_message = self._translate("Cannot generate visual: SVG file not found for %(base_name)s.", base_name=base_name)
                         raise FileNotFoundError(f"SVG file not found: {file_path}")
 
-                # If file_path exists now, parse and update attributes.
-                tree = etree.parse(file_path)
-                root = tree.getroot()
+                # If file_path exists now, parse (or copy the cached parse) and update attributes.
+                root = self._svg_resources.load_root(file_path)
                 root.attrib["x"] = str(x)
                 root.attrib["y"] = str(y)
                 root.attrib["width"] = str(width)
@@ -816,39 +817,39 @@ class FormalVisualGenerator:
                 items = []
                 show_something = container_name or container_type or attr_name or attr_entity_type
                 if not show_something:
-                    items.append(("text", ""))
+                    items.append(("text", "", None))
                 else:
                     # Check if container_type exists and the corresponding SVG file is valid
                     if container_type:
                         figure_path = get_figure_svg_path(container_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", container_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", container_type, figure_path))
                         else:
                             self._missing_svg_entities.append(container_type)
-                            logger.debug(f"SVG for container_type '{container_type}' does not exist. Ignoring container_type.")
+                            logger.debug("SVG for container_type '%s' does not exist. Ignoring container_type.", container_type)
                     
                     if container_name:
-                        items.append(("text", container_name))
+                        items.append(("text", container_name, None))
 
                     if attr_entity_type and attr_name:
                         figure_path = get_figure_svg_path(attr_entity_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", attr_entity_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", attr_entity_type, figure_path))
                         else:
                             self._missing_svg_entities.append(attr_entity_type)
-                            logger.debug(f"SVG for attr_entity_type '{attr_entity_type}' does not exist. Ignoring attr_entity_type.")
-                        items.append(("text", attr_name))
+                            logger.debug("SVG for attr_entity_type '%s' does not exist. Ignoring attr_entity_type.", attr_entity_type)
+                        items.append(("text", attr_name, None))
 
                 # Simulate the needed width for all items
                 item_positions = []
                 total_width = 0
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
                         width = UNIT_SIZE
                     else:
                         # Calculate text width based on length
                         width = len(v) * 7  # Approximate width per character at font-size 15px
-                    item_positions.append((t, v, width))
+                    item_positions.append((t, v, figure_path, width))
                     total_width += width
                     if idx < len(items) - 1:
                         total_width += 10  # Add spacing between items
@@ -860,24 +861,22 @@ class FormalVisualGenerator:
                 group = etree.SubElement(parent, "g")
                 current_x = start_x
 
-                for idx, (t, v, width) in enumerate(item_positions):
+                for idx, (t, v, figure_path, width) in enumerate(item_positions):
                     if t == "svg":
-                        figure_path = get_figure_svg_path(v)
-                        if figure_path and os.path.exists(figure_path):
-                            svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
-                            # Add DSL path metadata for SVG elements (container type or attribute type)
-                            if v == container_type and container_type:
-                                container_type_dsl_path = f"{entity_dsl_path}/container_type"
-                                svg_el.set('data-dsl-path', container_type_dsl_path)
-                                svg_el.set('visual-element-path', container_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            elif v == attr_entity_type and attr_entity_type:
-                                attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
-                                svg_el.set('data-dsl-path', attr_type_dsl_path)
-                                svg_el.set('visual-element-path', attr_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            # Append the returned svg element to the group
-                            group.append(svg_el)
+                        svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
+                        # Add DSL path metadata for SVG elements (container type or attribute type)
+                        if v == container_type and container_type:
+                            container_type_dsl_path = f"{entity_dsl_path}/container_type"
+                            svg_el.set('data-dsl-path', container_type_dsl_path)
+                            svg_el.set('visual-element-path', container_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        elif v == attr_entity_type and attr_entity_type:
+                            attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
+                            svg_el.set('data-dsl-path', attr_type_dsl_path)
+                            svg_el.set('visual-element-path', attr_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        # Append the returned svg element to the group
+                        group.append(svg_el)
                         current_x += width
                     else:
                         # text_x = current_x + (width / 2)  # Center the text properly
@@ -1143,7 +1142,7 @@ class FormalVisualGenerator:
                     operator_svg_path = os.path.join(resources_path, f"{mapped_operator_entity_type}.svg")
                     
                     # Fallback to the default operator SVG if the file does not exist
-                    if not os.path.exists(operator_svg_path):
+                    if not self._svg_resources.exists(operator_svg_path):
                         fallback_entity_type = operator_svg_mapping["default"]
                         operator_svg_path = os.path.join(resources_path, f"{fallback_entity_type}.svg")
                     
@@ -1169,7 +1168,7 @@ class FormalVisualGenerator:
             if operations and data.get("operation") != "identity":
                 # Draw equals
                 equals_svg_path = os.path.join(resources_path, "equals.svg")
-                if not os.path.exists(equals_svg_path):
+                if not self._svg_resources.exists(equals_svg_path):
                     equals_svg_path = os.path.join(resources_path, "equals_default.svg")  # Fallback if necessary
                 svg_root.append(embed_svg(equals_svg_path, x=eq_x, y=eq_y, width=30, height=30))
 
@@ -1178,7 +1177,7 @@ class FormalVisualGenerator:
                 if operations and operations[-1]["entity_type"] == "surplus":
                     # Draw the first question mark
                     question_mark_svg_path = os.path.join(resources_path, "question.svg")
-                    if not os.path.exists(question_mark_svg_path):
+                    if not self._svg_resources.exists(question_mark_svg_path):
                         question_mark_svg_path = os.path.join(resources_path, "question_default.svg")  # Fallback if necessary
                     svg_root.append(embed_svg(question_mark_svg_path, x=qmark_x, y=qmark_y, width=60, height=60))
 
@@ -1207,7 +1206,7 @@ class FormalVisualGenerator:
                 else:
                     # Default case: draw a single question mark
                     question_mark_svg_path = os.path.join(resources_path, "question.svg")
-                    if not os.path.exists(question_mark_svg_path):
+                    if not self._svg_resources.exists(question_mark_svg_path):
                         question_mark_svg_path = os.path.join(resources_path, "question_default.svg")  # Fallback if necessary
                     svg_root.append(embed_svg(question_mark_svg_path, x=qmark_x, y=qmark_y, width=60, height=60))
                     last_x_point = qmark_x + 60
@@ -1296,8 +1295,8 @@ class FormalVisualGenerator:
         
         # Write to output file
         if created:
-            with open(output_file, "wb") as f:
-                f.write(etree.tostring(svg_root, pretty_print=True))
+            # Serialize straight to the file instead of building the whole document as bytes first
+            svg_root.getroottree().write(output_file, pretty_print=SVG_PRETTY)
         else:
             logger.error(f"error_message: {self.error_message}")
         return created
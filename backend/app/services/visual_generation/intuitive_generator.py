@@ -9,6 +9,7 @@ import difflib
 import inflect
 import logging
 from app.services.visual_generation.container_type_utils import update_container_types_optimized
+from app.services.visual_generation.svg_resources import SVG_PRETTY, SVGResourceCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class IntuitiveVisualGenerator():
         logger.debug("__init__")
         self.error_message = ""
         self._svg_directory_cache = {}
+        self._svg_resources = SVGResourceCache()
         self._missing_svg_entities = []
         self.p = inflect.engine()
         self._translate = translate if translate else lambda msg, **kwargs: msg
@@ -215,8 +217,8 @@ class IntuitiveVisualGenerator():
                     # Strictly higher priority => definitely bracket
                     need_brackets = True
                 elif parent_priority == current_priority:
-                    logger.debug(f"container_name: {container_name}")
-                    logger.debug(f"parent_container_name: {parent_container_name}")
+                    logger.debug("container_name: %s", container_name)
+                    logger.debug("parent_container_name: %s", parent_container_name)
                     # Possibly skip brackets if the parent/child op is associative
                     # and container_name is the same, etc. Tweak logic as desired:
                     if not can_skip_same_precedence(parent_op, op):
@@ -533,7 +535,7 @@ class IntuitiveVisualGenerator():
             
             repeated_ents = [e for e in containers if e.get("layout") != "multiplier"]
             container_name = containers[0].get('container_name',"")
-            logger.debug(f"container_name: {container_name}")
+            logger.debug("container_name: %s", container_name)
             # 2) Decide how to lay out repeated containers in a grid
             count = len(repeated_ents)
             if container_name == "row":
@@ -603,8 +605,8 @@ class IntuitiveVisualGenerator():
 
             def embed_svg(file_path, x, y, width, height):
                 logger.debug("embed_svg")
-                if not os.path.exists(file_path):
-                    logger.debug(f"SVG file not found: {file_path}")
+                if not self._svg_resources.exists(file_path):
+                    logger.debug("SVG file not found: %s", file_path)
                     # Get the directory and base name from the file_path
                     dir_path = os.path.dirname(file_path)
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -668,9 +670,8 @@ class IntuitiveVisualGenerator():
                         self.error_message = self._translate("SVG file not found for %(base_name)s.", base_name=base_name)
                         raise FileNotFoundError(f"SVG file not found: {file_path}")
 
-                # If file_path exists now, parse and update attributes.
-                tree = etree.parse(file_path)
-                root = tree.getroot()
+                # If file_path exists now, parse (or copy the cached parse) and update attributes.
+                root = self._svg_resources.load_root(file_path)
                 root.attrib["x"] = str(x)
                 root.attrib["y"] = str(y)
                 root.attrib["width"] = str(width)
@@ -682,7 +683,7 @@ class IntuitiveVisualGenerator():
                 if attr_type:
                     return os.path.join(resources_path, f"{attr_type}.svg")
                 self.error_message = self._translate("Cannot find figure path for attribute type: %(attr_type)s.", attr_type=attr_type)
-                logger.debug(f"Cannot find figure path for attr_type: {attr_type}")
+                logger.debug("Cannot find figure path for attr_type: %s", attr_type)
                 return None
 
         
@@ -692,33 +693,33 @@ class IntuitiveVisualGenerator():
                 # print("container_name", container_name)
                 items = []
                 show_something = container_name or container_type or attr_name or attr_type
-                logger.debug(f"container_type {container_type}")
+                logger.debug("container_type %s", container_type)
                 if not show_something:
-                    items.append(("text", ""))
+                    items.append(("text", "", None))
                 else:
                     # Check if container_type exists and the corresponding SVG file is valid
                     if container_type:
                         figure_path = get_figure_svg_path(container_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", container_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", container_type, figure_path))
                         else:
                             self._missing_svg_entities.append(container_type)
-                            logger.debug(f"SVG for container_type '{container_type}' does not exist. Ignoring container_type.")
+                            logger.debug("SVG for container_type '%s' does not exist. Ignoring container_type.", container_type)
                     
                     if container_name:
-                        items.append(("text", container_name))
+                        items.append(("text", container_name, None))
 
                     if attr_type and attr_name:
                         figure_path = get_figure_svg_path(attr_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", attr_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", attr_type, figure_path))
                         else:
                             self._missing_svg_entities.append(attr_type)
-                            logger.debug(f"SVG for attr_type '{attr_type}' does not exist. Ignoring attr_type.")
-                        items.append(("text", attr_name))
+                            logger.debug("SVG for attr_type '%s' does not exist. Ignoring attr_type.", attr_type)
+                        items.append(("text", attr_name, None))
 
                 total_width = 0
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
                         total_width += UNIT_SIZE
                     else:
@@ -731,22 +732,20 @@ class IntuitiveVisualGenerator():
                 center_y = box_y - UNIT_SIZE - 5
                 current_x = start_x_txt
 
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
-                        figure_path = get_figure_svg_path(v)
-                        if figure_path and os.path.exists(figure_path):
-                            svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
-                            # Add DSL path metadata for SVG elements (container type or attribute type)
-                            if v == container_type and container_type:
-                                container_type_dsl_path = f"{entity_dsl_path}/container_type"
-                                svg_el.set('data-dsl-path', container_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            elif v == attr_type and attr_type:
-                                attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
-                                svg_el.set('data-dsl-path', attr_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            # Append the returned svg element to the group
-                            group.append(svg_el)
+                        svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
+                        # Add DSL path metadata for SVG elements (container type or attribute type)
+                        if v == container_type and container_type:
+                            container_type_dsl_path = f"{entity_dsl_path}/container_type"
+                            svg_el.set('data-dsl-path', container_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        elif v == attr_type and attr_type:
+                            attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
+                            svg_el.set('data-dsl-path', attr_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        # Append the returned svg element to the group
+                        group.append(svg_el)
                         current_x += UNIT_SIZE
                     else:
                         text_y = center_y + UNIT_SIZE / 2
@@ -771,7 +770,7 @@ class IntuitiveVisualGenerator():
 
             def draw_entity(e):
                 logger.debug("draw_entity")
-                logger.debug(f"new entity: {e}")
+                logger.debug("new entity: %s", e)
                 q = e["item"].get("entity_quantity", 0)
                 t = e["item"].get("entity_type", "apple")
                 container_name = e.get("container_name", "").strip()
@@ -1000,7 +999,7 @@ class IntuitiveVisualGenerator():
 
             # Draw containers
             for entity in containers:  # Assuming exactly two containers
-                logger.debug(f"entity: {entity}")
+                logger.debug("entity: %s", entity)
                 draw_entity(entity)
             
             # Draw operator
@@ -1414,8 +1413,8 @@ class IntuitiveVisualGenerator():
 
             def embed_svg(file_path, x, y, width, height):
                 logger.debug("embed_svg")
-                if not os.path.exists(file_path):
-                    logger.debug(f"SVG file not found: {file_path}")
+                if not self._svg_resources.exists(file_path):
+                    logger.debug("SVG file not found: %s", file_path)
                     # Get the directory and base name from the file_path
                     dir_path = os.path.dirname(file_path)
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -1478,9 +1477,8 @@ class IntuitiveVisualGenerator():
                         self.error_message = self._translate("Cannot generate visual: SVG file not found for %(base_name)s.", base_name=base_name)
                         raise FileNotFoundError(f"SVG file not found: {file_path}")
 
-                # If file_path exists now, parse and update attributes.
-                tree = etree.parse(file_path)
-                root = tree.getroot()
+                # If file_path exists now, parse (or copy the cached parse) and update attributes.
+                root = self._svg_resources.load_root(file_path)
                 root.attrib["x"] = str(x)
                 root.attrib["y"] = str(y)
                 root.attrib["width"] = str(width)
@@ -1499,33 +1497,33 @@ class IntuitiveVisualGenerator():
 
                 items = []
                 show_something = container_name or container_type or attr_name or attr_type
-                logger.debug(f"container_type {container_type}")
+                logger.debug("container_type %s", container_type)
                 if not show_something:
-                    items.append(("text", ""))
+                    items.append(("text", "", None))
                 else:
                     # Check if container_type exists and the corresponding SVG file is valid
                     if container_type:
                         figure_path = get_figure_svg_path(container_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", container_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", container_type, figure_path))
                         else:
                             self._missing_svg_entities.append(container_type)
-                            logger.debug(f"SVG for container_type '{container_type}' does not exist. Ignoring container_type.")
+                            logger.debug("SVG for container_type '%s' does not exist. Ignoring container_type.", container_type)
                     
                     if container_name:
-                        items.append(("text", container_name))
+                        items.append(("text", container_name, None))
 
                     if attr_type and attr_name:
                         figure_path = get_figure_svg_path(attr_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", attr_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", attr_type, figure_path))
                         else:
                             self._missing_svg_entities.append(attr_type)
-                            logger.debug(f"SVG for attr_type '{attr_type}' does not exist. Ignoring attr_type.")
-                        items.append(("text", attr_name))
+                            logger.debug("SVG for attr_type '%s' does not exist. Ignoring attr_type.", attr_type)
+                        items.append(("text", attr_name, None))
 
                 total_width = 0
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
                         total_width += UNIT_SIZE
                     else:
@@ -1538,22 +1536,20 @@ class IntuitiveVisualGenerator():
                 center_y = box_y - UNIT_SIZE - 5
                 current_x = start_x_txt
 
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
-                        figure_path = get_figure_svg_path(v)
-                        if figure_path and os.path.exists(figure_path):
-                            svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
-                            # Add DSL path metadata for SVG elements (container type or attribute type)
-                            if v == container_type and container_type:
-                                container_type_dsl_path = f"{entity_dsl_path}/container_type"
-                                svg_el.set('data-dsl-path', container_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            elif v == attr_type and attr_type:
-                                attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
-                                svg_el.set('data-dsl-path', attr_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            # Append the returned svg element to the group
-                            group.append(svg_el)
+                        svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
+                        # Add DSL path metadata for SVG elements (container type or attribute type)
+                        if v == container_type and container_type:
+                            container_type_dsl_path = f"{entity_dsl_path}/container_type"
+                            svg_el.set('data-dsl-path', container_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        elif v == attr_type and attr_type:
+                            attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
+                            svg_el.set('data-dsl-path', attr_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        # Append the returned svg element to the group
+                        group.append(svg_el)
                         current_x += UNIT_SIZE
                     else:
                         text_y = center_y + UNIT_SIZE / 2
@@ -1578,7 +1574,7 @@ class IntuitiveVisualGenerator():
 
             def draw_entity(e):
                 logger.debug("draw_entity")
-                logger.debug(f"new entity: {e}")
+                logger.debug("new entity: %s", e)
                 q = e["item"].get("entity_quantity", 0)
                 t = e["item"].get("entity_type", "apple")
                 container_name = e.get("container_name", "").strip()
@@ -1817,7 +1813,7 @@ class IntuitiveVisualGenerator():
 
             # Draw containers
             for entity in containers:  # Assuming exactly two containers
-                logger.debug(f"entity: {entity}")
+                logger.debug("entity: %s", entity)
                 draw_entity(entity)
             
             # Draw operator
@@ -1835,7 +1831,7 @@ class IntuitiveVisualGenerator():
             svg_root.attrib["width"] = str(final_width)
             svg_root.attrib["height"] = str(final_height)
 
-            logger.debug(f"flag_division_entity_type_same {flag_division_entity_type_same}")
+            logger.debug("flag_division_entity_type_same %s", flag_division_entity_type_same)
             # Draw big box
             if len(containers) > 1 and flag_division_entity_type_same:
                 big_box_x = 20 # Add padding on the left
@@ -1846,7 +1842,7 @@ class IntuitiveVisualGenerator():
                 # Embed text and figures at the top of the big box
                 # result_container = result_containers[-1]
                 container_entity = original_containers[0]
-                logger.debug(f"container_entity {container_entity}")
+                logger.debug("container_entity %s", container_entity)
                 container_dsl_path = container_entity.get('_dsl_path', '')
                 embed_top_figures_and_text(svg_root, big_box_x, big_box_y, big_box_width, container_entity['container_type'], container_entity['container_name'], container_entity['attr_type'], container_entity['attr_name'], container_dsl_path)
 
@@ -1893,7 +1889,7 @@ class IntuitiveVisualGenerator():
                 # Embed text and figures at the top of the big box
                 # result_container = result_containers[-1]
                 container_entity = original_containers[0]
-                logger.debug(f"container_entity {container_entity}")
+                logger.debug("container_entity %s", container_entity)
                 container_dsl_path = container_entity.get('_dsl_path', '')
                 embed_top_figures_and_text(svg_root, big_box_x, big_box_y, big_box_width, container_entity['container_type'], container_entity['container_name'], container_entity['attr_type'], container_entity['attr_name'], container_dsl_path)
 
@@ -2282,8 +2278,8 @@ class IntuitiveVisualGenerator():
 
             def embed_svg(file_path, x, y, width, height):
                 logger.debug("embed_svg")
-                if not os.path.exists(file_path):
-                    logger.debug(f"SVG file not found: {file_path}")
+                if not self._svg_resources.exists(file_path):
+                    logger.debug("SVG file not found: %s", file_path)
                     # Get the directory and base name from the file_path
                     dir_path = os.path.dirname(file_path)
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -2346,9 +2342,8 @@ class IntuitiveVisualGenerator():
                         self.error_message = self._translate("Cannot generate visual: SVG file not found for %(base_name)s.", base_name=base_name)
                         raise FileNotFoundError(f"SVG file not found: {file_path}")
 
-                # If file_path exists now, parse and update attributes.
-                tree = etree.parse(file_path)
-                root = tree.getroot()
+                # If file_path exists now, parse (or copy the cached parse) and update attributes.
+                root = self._svg_resources.load_root(file_path)
                 root.attrib["x"] = str(x)
                 root.attrib["y"] = str(y)
                 root.attrib["width"] = str(width)
@@ -2369,33 +2364,33 @@ class IntuitiveVisualGenerator():
                 # print("container_name", container_name)
                 items = []
                 show_something = container_name or container_type or attr_name or attr_type
-                logger.debug(f"container_type {container_type}")
+                logger.debug("container_type %s", container_type)
                 if not show_something:
-                    items.append(("text", ""))
+                    items.append(("text", "", None))
                 else:
                     # Check if container_type exists and the corresponding SVG file is valid
                     if container_type:
                         figure_path = get_figure_svg_path(container_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", container_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", container_type, figure_path))
                         else:
                             self._missing_svg_entities.append(container_type)
-                            logger.debug(f"SVG for container_type '{container_type}' does not exist. Ignoring container_type.")
+                            logger.debug("SVG for container_type '%s' does not exist. Ignoring container_type.", container_type)
                     
                     if container_name:
-                        items.append(("text", container_name))
+                        items.append(("text", container_name, None))
 
                     if attr_type and attr_name:
                         figure_path = get_figure_svg_path(attr_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", attr_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", attr_type, figure_path))
                         else:
                             self._missing_svg_entities.append(attr_type)
-                            logger.debug(f"SVG for attr_type '{attr_type}' does not exist. Ignoring attr_type.")
-                        items.append(("text", attr_name))
+                            logger.debug("SVG for attr_type '%s' does not exist. Ignoring attr_type.", attr_type)
+                        items.append(("text", attr_name, None))
 
                 total_width = 0
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
                         total_width += UNIT_SIZE
                     else:
@@ -2408,22 +2403,20 @@ class IntuitiveVisualGenerator():
                 center_y = box_y - UNIT_SIZE - 5
                 current_x = start_x_txt
 
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
-                        figure_path = get_figure_svg_path(v)
-                        if figure_path and os.path.exists(figure_path):
-                            svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
-                            # Add DSL path metadata for SVG elements (container type or attribute type)
-                            if v == container_type and container_type:
-                                container_type_dsl_path = f"{entity_dsl_path}/container_type"
-                                svg_el.set('data-dsl-path', container_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            elif v == attr_type and attr_type:
-                                attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
-                                svg_el.set('data-dsl-path', attr_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            # Append the returned svg element to the group
-                            group.append(svg_el)
+                        svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
+                        # Add DSL path metadata for SVG elements (container type or attribute type)
+                        if v == container_type and container_type:
+                            container_type_dsl_path = f"{entity_dsl_path}/container_type"
+                            svg_el.set('data-dsl-path', container_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        elif v == attr_type and attr_type:
+                            attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
+                            svg_el.set('data-dsl-path', attr_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        # Append the returned svg element to the group
+                        group.append(svg_el)
                         current_x += UNIT_SIZE
                     else:
                         text_y = center_y + UNIT_SIZE / 2
@@ -2448,7 +2441,7 @@ class IntuitiveVisualGenerator():
 
             def draw_entity(e):
                 logger.debug("draw_entity")
-                logger.debug(f"new entity: {e}")
+                logger.debug("new entity: %s", e)
                 q = e["item"].get("entity_quantity", 0)
                 t = e["item"].get("entity_type", "apple")
                 container_name = e.get("container_name", "").strip()
@@ -2693,7 +2686,7 @@ class IntuitiveVisualGenerator():
 
             # Draw containers
             for entity in containers:  # Assuming exactly two containers
-                logger.debug(f"entity: {entity}")
+                logger.debug("entity: %s", entity)
                 draw_entity(entity)
             
             # Draw operator
@@ -2811,8 +2804,8 @@ class IntuitiveVisualGenerator():
     
             def embed_svg(file_path, x, y, width, height):
                 logger.debug("embed_svg")
-                if not os.path.exists(file_path):
-                    logger.debug(f"SVG file not found: {file_path}")
+                if not self._svg_resources.exists(file_path):
+                    logger.debug("SVG file not found: %s", file_path)
                     # Get the directory and base name from the file_path
                     dir_path = os.path.dirname(file_path)
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -2875,9 +2868,8 @@ class IntuitiveVisualGenerator():
                         self.error_message = self._translate("Cannot generate visual: SVG file not found for %(base_name)s.", base_name=base_name)
                         raise FileNotFoundError(f"SVG file not found: {file_path}")
 
-                # If file_path exists now, parse and update attributes.
-                tree = etree.parse(file_path)
-                root = tree.getroot()
+                # If file_path exists now, parse (or copy the cached parse) and update attributes.
+                root = self._svg_resources.load_root(file_path)
                 root.attrib["x"] = str(x)
                 root.attrib["y"] = str(y)
                 root.attrib["width"] = str(width)
@@ -2910,10 +2902,10 @@ class IntuitiveVisualGenerator():
             # 9. Load and display the shape SVG
             shape_path = get_figure_svg_path(container_type)
             clean_shape_path = get_figure_svg_path(container_type + "_clean")
-            if shape_path and os.path.exists(shape_path):
+            if shape_path and self._svg_resources.exists(shape_path):
                 self.remove_svg_blanks(shape_path, clean_shape_path)
-                logger.debug(f"shape_display_width {shape_display_width}")
-                logger.debug(f"shape_display_height {shape_display_height}")
+                logger.debug("shape_display_width %s", shape_display_width)
+                logger.debug("shape_display_height %s", shape_display_height)
                 shape_svg = embed_svg(clean_shape_path, shape_x, shape_y, 
                                     shape_display_width, shape_display_height)
                 # Annotate shape with DSL metadata for entity_type hover
@@ -2922,7 +2914,7 @@ class IntuitiveVisualGenerator():
                 svg_root.append(shape_svg)
             else:
                 # If the SVG does not exist, draw an orange rectangle
-                logger.debug(f"No valid SVG found for container_type = '{container_type}'. Drawing an orange box instead.")
+                logger.debug("No valid SVG found for container_type = '%s'. Drawing an orange box instead.", container_type)
                 rectangle = etree.SubElement(svg_root, "rect",
                                             x=str(shape_x),
                                             y=str(shape_y),
@@ -3127,8 +3119,8 @@ class IntuitiveVisualGenerator():
                     return
 
             logger.debug("Before allocation:")
-            logger.debug(f"addition_containers: {addition_containers}")
-            logger.debug(f"subtrahend_containers: {subtrahend_containers}")
+            logger.debug("addition_containers: %s", addition_containers)
+            logger.debug("subtrahend_containers: %s", subtrahend_containers)
 
             # 2) Initialize a list to track subtractions on each addition entity
             for a_ent in addition_containers:
@@ -3189,8 +3181,8 @@ class IntuitiveVisualGenerator():
                 # to match. You can handle leftover if needed.
 
             logger.debug("After allocation:")
-            logger.debug(f"addition_containers: {addition_containers}")
-            logger.debug(f"subtrahend_containers: {subtrahend_containers}")
+            logger.debug("addition_containers: %s", addition_containers)
+            logger.debug("subtrahend_containers: %s", subtrahend_containers)
 
             # 4) Final check: If an addition entity has subtractions AND entity_quantity > 10 => print message
             for a_ent in addition_containers:
@@ -3407,8 +3399,8 @@ class IntuitiveVisualGenerator():
         
             def embed_svg(file_path, x, y, width, height):
                 logger.debug("embed_svg")
-                if not os.path.exists(file_path):
-                    logger.debug(f"SVG file not found: {file_path}")
+                if not self._svg_resources.exists(file_path):
+                    logger.debug("SVG file not found: %s", file_path)
                     # Get the directory and base name from the file_path
                     dir_path = os.path.dirname(file_path)
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -3471,9 +3463,8 @@ class IntuitiveVisualGenerator():
                         self.error_message = self._translate("Cannot generate visual: SVG file not found for %(base_name)s.", base_name=base_name)
                         raise FileNotFoundError(f"SVG file not found: {file_path}")
 
-                # If file_path exists now, parse and update attributes.
-                tree = etree.parse(file_path)
-                root = tree.getroot()
+                # If file_path exists now, parse (or copy the cached parse) and update attributes.
+                root = self._svg_resources.load_root(file_path)
                 root.attrib["x"] = str(x)
                 root.attrib["y"] = str(y)
                 root.attrib["width"] = str(width)
@@ -3492,41 +3483,41 @@ class IntuitiveVisualGenerator():
                 logger.debug("calling embed_top_figures_and_text")
                 items = []
                 show_something = container_name or container_type or attr_name or attr_type
-                logger.debug(f"container_type {container_type}")
+                logger.debug("container_type %s", container_type)
                 if not show_something:
-                    items.append(("text", ""))
+                    items.append(("text", "", None))
                 else:
                     # Check if container_type exists and the corresponding SVG file is valid
                     if container_type:
                         figure_path = get_figure_svg_path(container_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", container_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", container_type, figure_path))
                         else:
                             self._missing_svg_entities.append(container_type)
-                            logger.debug(f"SVG for container_type '{container_type}' does not exist. Ignoring container_type.")
+                            logger.debug("SVG for container_type '%s' does not exist. Ignoring container_type.", container_type)
                     
                     if container_name:
-                        items.append(("text", container_name))
+                        items.append(("text", container_name, None))
 
                     if attr_type and attr_name:
                         figure_path = get_figure_svg_path(attr_type)
-                        if figure_path and os.path.exists(figure_path):
-                            items.append(("svg", attr_type))
+                        if figure_path and self._svg_resources.exists(figure_path):
+                            items.append(("svg", attr_type, figure_path))
                         else:
                             self._missing_svg_entities.append(attr_type)
-                            logger.debug(f"SVG for attr_type '{attr_type}' does not exist. Ignoring attr_type.")
-                        items.append(("text", attr_name))
+                            logger.debug("SVG for attr_type '%s' does not exist. Ignoring attr_type.", attr_type)
+                        items.append(("text", attr_name, None))
 
                 # Simulate the needed width for all items
                 item_positions = []
                 total_width = 0
-                for idx, (t, v) in enumerate(items):
+                for idx, (t, v, figure_path) in enumerate(items):
                     if t == "svg":
                         width = UNIT_SIZE
                     else:
                         # Calculate text width based on length
                         width = len(v) * 7  # Approximate width per character at font-size 15px
-                    item_positions.append((t, v, width))
+                    item_positions.append((t, v, figure_path, width))
                     total_width += width
                     if idx < len(items) - 1:
                         total_width += 10  # Add spacing between items
@@ -3538,22 +3529,20 @@ class IntuitiveVisualGenerator():
                 group = etree.SubElement(parent, "g")
                 current_x = start_x
 
-                for idx, (t, v, width) in enumerate(item_positions):
+                for idx, (t, v, figure_path, width) in enumerate(item_positions):
                     if t == "svg":
-                        figure_path = get_figure_svg_path(v)
-                        if figure_path and os.path.exists(figure_path):
-                            svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
-                            # Add DSL path metadata for SVG elements (container type or attribute type)
-                            if v == container_type and container_type:
-                                container_type_dsl_path = f"{entity_dsl_path}/container_type"
-                                svg_el.set('data-dsl-path', container_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            elif v == attr_type and attr_type:
-                                attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
-                                svg_el.set('data-dsl-path', attr_type_dsl_path)
-                                svg_el.set('style', 'pointer-events: bounding-box;')
-                            # Append the returned svg element to the group
-                            group.append(svg_el)
+                        svg_el = embed_svg(figure_path, x=current_x, y=center_y, width=UNIT_SIZE, height=UNIT_SIZE)
+                        # Add DSL path metadata for SVG elements (container type or attribute type)
+                        if v == container_type and container_type:
+                            container_type_dsl_path = f"{entity_dsl_path}/container_type"
+                            svg_el.set('data-dsl-path', container_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        elif v == attr_type and attr_type:
+                            attr_type_dsl_path = f"{entity_dsl_path}/attr_type"
+                            svg_el.set('data-dsl-path', attr_type_dsl_path)
+                            svg_el.set('style', 'pointer-events: bounding-box;')
+                        # Append the returned svg element to the group
+                        group.append(svg_el)
                         current_x += width
                     else:
                         # text_x = current_x + (width / 2)  # Center the text properly
@@ -3765,7 +3754,7 @@ class IntuitiveVisualGenerator():
                             "color": color
                         })
 
-                    logger.debug(f"sub_segments: {sub_segments}")
+                    logger.debug("sub_segments: %s", sub_segments)
                     # 2) Now draw items AND crosses in the same loop
                     # ----------------------------------------------
                     if layout in ["normal", "row", "column"]:
@@ -3847,7 +3836,7 @@ class IntuitiveVisualGenerator():
 
             # Draw containers
             for entity in containers:  # Assuming exactly two containers
-                logger.debug(f"entity: {entity}")
+                logger.debug("entity: %s", entity)
                 draw_entity(entity)
             
     
@@ -3978,9 +3967,9 @@ class IntuitiveVisualGenerator():
                 result_i = comp_result_container_list[i]
                 svg_width = 0
                 svg_height = 0
-                logger.debug(f"handle_comparison loop, operations_i: {operations_i}")
-                logger.debug(f"handle_comparison loop, containers_i: {containers_i}")
-                logger.debug(f"handle_comparison, result_i: {result_i}")
+                logger.debug("handle_comparison loop, operations_i: %s", operations_i)
+                logger.debug("handle_comparison loop, containers_i: %s", containers_i)
+                logger.debug("handle_comparison, result_i: %s", result_i)
 
                 if all(op["entity_type"] in ["addition", "subtraction"] for op in operations_i):
                     logger.debug("Handling tvq_final")
@@ -4081,7 +4070,7 @@ class IntuitiveVisualGenerator():
 
                 current_x += svg_width + 110  # spacing
 
-            logger.debug(f"handle_comparison, entity_box: {entity_boxes}")
+            logger.debug("handle_comparison, entity_box: %s", entity_boxes)
             # draw balance scale
             draw_balance_scale(svg_root, entity_boxes, comparison_dsl_path)
 
@@ -4333,13 +4322,13 @@ class IntuitiveVisualGenerator():
             # compare2_operations = compare2_operations[::-1]
             # compare1_operations = [{"entity_type": op} for op in compare1_operations]
             # compare2_operations = [{"entity_type": op} for op in compare2_operations]
-            logger.debug(f"compare 1 operations: {compare1_operations}")
-            logger.debug(f"compare 1 containers: {compare1_containers}")
-            logger.debug(f"compare 1 result containers: {compare1_result_containers}")
+            logger.debug("compare 1 operations: %s", compare1_operations)
+            logger.debug("compare 1 containers: %s", compare1_containers)
+            logger.debug("compare 1 result containers: %s", compare1_result_containers)
 
-            logger.debug(f"compare 2 operations: {compare2_operations}")
-            logger.debug(f"compare 2 containers: {compare2_containers}")
-            logger.debug(f"compare 2 result containers: {compare2_result_containers}")
+            logger.debug("compare 2 operations: %s", compare2_operations)
+            logger.debug("compare 2 containers: %s", compare2_containers)
+            logger.debug("compare 2 result containers: %s", compare2_result_containers)
             try:
                 created, svg_width, svg_height = handle_comparison(compare1_operations, compare1_containers, compare1_result_containers,
                             compare2_operations, compare2_containers, compare2_result_containers,
@@ -4368,9 +4357,9 @@ class IntuitiveVisualGenerator():
 
             # operations = operations[::-1]
             # operations = [{"entity_type": op} for op in operations]  # This line was causing the nested structure bug
-            logger.debug(f"Operations: {operations}")
-            logger.debug(f"containers: {containers}")
-            logger.debug(f"Result containers: {result_containers}")
+            logger.debug("Operations: %s", operations)
+            logger.debug("containers: %s", containers)
+            logger.debug("Result containers: %s", result_containers)
 
             if data.get("operation") == "identity":
                 logger.debug("Handling single-container / identity (no operations)")
@@ -4424,10 +4413,10 @@ class IntuitiveVisualGenerator():
                     created = False
         
         # Write to output file
-        logger.debug(f"SVG created: {created}")
+        logger.debug("SVG created: %s", created)
         if created:
-            with open(output_file, "wb") as f:
-                f.write(etree.tostring(svg_root, pretty_print=True))
+            # Serialize straight to the file instead of building the whole document as bytes first
+            svg_root.getroottree().write(output_file, pretty_print=SVG_PRETTY)
         else:
             logger.debug("error_message: %s", self.error_message)
         return created
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+Shared SVG resource file access for the formal and intuitive visual generators.
+"""
+import copy
+import os
+
+from lxml import etree
+
+# Indent the written SVG for debugging; off by default since it only adds bytes and serialization work
+SVG_PRETTY = os.getenv('SVG_PRETTY', 'false').lower() == 'true'
+
+
+class SVGResourceCache:
+    """
+    Per-generator cache of SVG resource files.
+
+    One visual embeds and checks the same entity and operator files many times, so each
+    file is looked up and parsed once and callers get their own copy to modify.
+    """
+
+    def __init__(self):
+        self._roots = {}
+        self._exists = {}
+
+    def exists(self, file_path):
+        """os.path.exists for an SVG resource file, checked once per path."""
+        exists = self._exists.get(file_path)
+        if exists is None:
+            exists = self._exists[file_path] = os.path.exists(file_path)
+        return exists
+
+    def load_root(self, file_path):
+        """Return a fresh copy of an SVG file's root element, parsing each file once."""
+        root = self._roots.get(file_path)
+        if root is None:
+            root = self._roots[file_path] = etree.parse(file_path).getroot()
+        return copy.deepcopy(root)
@@ -0,0 +1,31 @@
+"""
+JSON helpers for hot paths (SSE payloads, VISUAL_REQUEST parsing, JSON columns).
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+import json
+from typing import Any, Union
+
+# orjson - optional dependency
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can catch this for both backends
+JSONDecodeError = json.JSONDecodeError
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize obj to a compact JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document from str or bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
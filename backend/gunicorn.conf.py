@@ -56,6 +56,16 @@ def post_fork(server, worker):
     """Called just after a worker has been forked."""
     server.log.info("Worker spawned (pid: %s)", worker.pid)
 
+def post_worker_init(worker):
+    """Called just after a worker has been initialized (after gevent monkey-patching)."""
+    # Make gRPC (used by the Gemini SDK) cooperative, so a pending tutor request yields
+    # to other greenlets instead of blocking the whole worker
+    try:
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+    except ImportError:
+        worker.log.warning("grpc gevent support not available; Gemini calls will block the worker")
+
 def worker_abort(worker):
     """Called when a worker receives the SIGABRT signal."""
     worker.log.info("Worker received SIGABRT signal")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Gemini tutor helpers that do not call the Gemini API.
+
+Run with: python3 -m pytest tests/test_gemini_tutor.py
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from app.services.tutor import gemini_tutor
+from app.services.tutor.gemini_tutor import (
+    _VisualRequestStreamFilter,
+    _extract_visual_request,
+    _early_visual_request,
+    _NO_VISUAL_REQUEST,
+    is_final_answer,
+)
+
+
+class TestVisualRequestStreamFilter(unittest.TestCase):
+    """Test cases for filtering VISUAL_REQUEST lines out of streamed deltas."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.text = (
+            "Great!\nLet's picture it.\n"
+            'VISUAL_REQUEST={"variant":"intuitive","dsl_scope":"identity(container1[])"}\n'
+            "How many oranges does Janet have?"
+        )
+        self.expected = "Great!\nLet's picture it.\nHow many oranges does Janet have?"
+
+    def _run(self, chunk_size):
+        stream_filter = _VisualRequestStreamFilter()
+        out = []
+        for i in range(0, len(self.text), chunk_size):
+            out.append(stream_filter.feed(self.text[i:i + chunk_size]))
+        out.append(stream_filter.flush())
+        return "".join(out)
+
+    def test_marker_removed_for_any_chunking(self):
+        """Test the marker line is removed regardless of chunk boundaries."""
+        for chunk_size in (1, 2, 3, 5, 8, 13, len(self.text)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self._run(chunk_size), self.expected)
+
+    def test_partial_sentinel_is_released(self):
+        """Test a trailing sentinel prefix that never completes is still forwarded."""
+        stream_filter = _VisualRequestStreamFilter()
+        self.assertEqual(stream_filter.feed("Look: VISUAL_"), "Look: ")
+        self.assertEqual(stream_filter.flush(), "VISUAL_")
+
+    def test_text_without_marker_passes_through(self):
+        """Test plain text is forwarded unchanged."""
+        stream_filter = _VisualRequestStreamFilter()
+        self.assertEqual(stream_filter.feed("How many apples?"), "How many apples?")
+        self.assertEqual(stream_filter.flush(), "")
+
+
+class TestExtractVisualRequest(unittest.TestCase):
+    """Test cases for extracting the VISUAL_REQUEST payload from a full reply."""
+
+    def test_no_marker(self):
+        """Test replies without a marker are returned unchanged."""
+        text, visual_request = _extract_visual_request("  How many apples?  ")
+        self.assertEqual(text, "How many apples?")
+        self.assertIsNone(visual_request)
+
+    def test_marker_with_trailing_text(self):
+        """Test text after the JSON payload is preserved."""
+        reply = (
+            "Can you tell me the formula?\n"
+            'VISUAL_REQUEST={"variant":"formal","dsl_scope":"addition(a[x: {1}], b[])"}\n'
+            "How many in total?"
+        )
+        text, visual_request = _extract_visual_request(reply)
+        self.assertEqual(text, "Can you tell me the formula?\n\nHow many in total?")
+        self.assertEqual(visual_request, {"variant": "formal", "dsl_scope": "addition(a[x: {1}], b[])"})
+
+    def test_invalid_json_is_stripped(self):
+        """Test a malformed payload is removed and no visual request is returned."""
+        text, visual_request = _extract_visual_request('Look!\nVISUAL_REQUEST={"variant": formal}')
+        self.assertEqual(text, "Look!")
+        self.assertIsNone(visual_request)
+
+
+class TestEarlyVisualRequest(unittest.TestCase):
+    """Test cases for detecting a complete VISUAL_REQUEST payload in a partial reply."""
+
+    def test_incomplete_payload(self):
+        """Test nothing is reported until the payload's closing brace arrives."""
+        self.assertIs(_early_visual_request('Look!\nVISUAL_REQUEST={"variant": "for'), _NO_VISUAL_REQUEST)
+        self.assertIs(_early_visual_request("No marker {here}"), _NO_VISUAL_REQUEST)
+
+    def test_complete_payload(self):
+        """Test a balanced payload is parsed before the reply ends."""
+        partial = 'Look!\nVISUAL_REQUEST={"variant":"formal","dsl_scope":"a[x: {1}]"}\nHow ma'
+        self.assertEqual(_early_visual_request(partial), {"variant": "formal", "dsl_scope": "a[x: {1}]"})
+
+    def test_invalid_payload(self):
+        """Test a balanced but malformed payload is reported as None."""
+        self.assertIsNone(_early_visual_request('VISUAL_REQUEST={"variant": formal}'))
+
+
+class TestHistoryBudget(unittest.TestCase):
+    """Test cases for trimming prompt history to a character budget."""
+
+    def test_keeps_most_recent_lines_that_fit(self):
+        """Test older lines are dropped once the budget is exceeded."""
+        with mock.patch.object(gemini_tutor, "HISTORY_CHAR_BUDGET", 30):
+            lines = ["a" * 10, "b" * 10, "c" * 10]
+            self.assertEqual(gemini_tutor._fit_history_budget(lines), ["b" * 10, "c" * 10])
+
+    def test_always_keeps_latest_line(self):
+        """Test the newest line is kept even if it alone exceeds the budget."""
+        with mock.patch.object(gemini_tutor, "HISTORY_CHAR_BUDGET", 30):
+            self.assertEqual(gemini_tutor._fit_history_budget(["x" * 5, "y" * 100]), ["y" * 100])
+
+
+class TestIsFinalAnswer(unittest.TestCase):
+    """Test cases for detecting a bare, correct final answer."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.dsl = (
+            "addition(container1[entity_name: orange, entity_type: orange, entity_quantity: 9, "
+            "container_name: Janet, container_type: girl, attr_name: , attr_type: ], "
+            "container2[entity_name: orange, entity_type: orange, entity_quantity: 7, "
+            "container_name: Sharon, container_type: girl, attr_name: , attr_type: ], "
+            "result_container[entity_name: orange, entity_type: orange, entity_quantity: 16, "
+            "container_name: Janet and Sharon, container_type: , attr_name: , attr_type: ])"
+        )
+        self.history = self._history(self.dsl)
+
+    @staticmethod
+    def _history(dsl_scope):
+        """History whose last tutor turn shows a visual of dsl_scope, followed by the student's answer."""
+        return [
+            {"role": "student", "content": "Janet has 9 oranges and Sharon has 7. How many together?"},
+            {"role": "tutor", "content": "How many in total?",
+             "visual_request": {"variant": "intuitive", "dsl_scope": dsl_scope}},
+            {"role": "student", "content": "16"},
+        ]
+
+    def test_matching_answers(self):
+        """Test numeric answers equal to the final quantity are recognized."""
+        for answer in ("16", " 16 ", "16.0", "16,0", "16!"):
+            with self.subTest(answer=answer):
+                self.assertTrue(is_final_answer(answer, self.dsl, self.history))
+
+    def test_non_matching_answers(self):
+        """Test wrong numbers and free text fall through to the model."""
+        for answer in ("15", "9", "16 oranges", "I think 16", ""):
+            with self.subTest(answer=answer):
+                self.assertFalse(is_final_answer(answer, self.dsl, self.history))
+
+    def test_whitespace_differences_in_scope(self):
+        """Test a full-DSL scope that only differs in whitespace still counts as the final question."""
+        history = self._history("  " + self.dsl.replace(", ", ",  "))
+        self.assertTrue(is_final_answer("16", self.dsl, history))
+
+    def test_intermediate_step(self):
+        """Test a matching number does not end the problem while the tutor asks about a sub-step."""
+        sub_step = "identity(container1[entity_name: orange, entity_type: orange, entity_quantity: 16])"
+        self.assertFalse(is_final_answer("16", self.dsl, self._history(sub_step)))
+
+    def test_last_tutor_turn_without_visual(self):
+        """Test the fast path is skipped when the last tutor turn has no visual request."""
+        history = [
+            {"role": "student", "content": "Janet has 9 oranges and Sharon has 7. How many together?"},
+            {"role": "tutor", "content": "What operation should we use?"},
+            {"role": "student", "content": "16"},
+        ]
+        self.assertFalse(is_final_answer("16", self.dsl, history))
+
+    def test_without_result_container(self):
+        """Test DSL without a result container never short-circuits."""
+        dsl = "identity(container1[entity_quantity: 9])"
+        self.assertFalse(is_final_answer("9", dsl, self._history(dsl)))
+        self.assertFalse(is_final_answer("9", "", self._history("")))
+
+
+class TestAsyncReplies(unittest.TestCase):
+    """Test cases for the concurrency-bounded async reply API."""
+
+    class _FakeModel:
+        cached_content = None
+
+        async def generate_content_async(self, prompt):
+            await asyncio.sleep(0.01)
+            part = SimpleNamespace(text="How many apples?")
+            return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+    def _run_batch(self):
+        history = [{"role": "student", "content": "Tom has 3 apples."}]
+        return asyncio.run(gemini_tutor.generate_tutor_replies([("identity(a[])", history, "en")] * 3))
+
+    def test_replies_from_separate_event_loops(self):
+        """Test the API works from several event loops under contention for the semaphore."""
+        with mock.patch.object(gemini_tutor, "MAX_CONCURRENT_REQUESTS", 1), \
+                mock.patch.object(gemini_tutor, "RESPONSE_CACHE_SIZE", 0), \
+                mock.patch.object(gemini_tutor, "_get_model", return_value=self._FakeModel()):
+            for _ in range(2):
+                self.assertEqual(self._run_batch(), [("How many apples?", None)] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
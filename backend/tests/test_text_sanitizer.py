@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tutor message sanitization.
+
+Run with: python3 -m pytest tests/test_text_sanitizer.py
+"""
+
+import unittest
+import nh3
+from app.services.validation.text_sanitizer import sanitize_tutor_message
+
+
+class TestSanitizeTutorMessage(unittest.TestCase):
+    """Test cases for stripping HTML from tutor messages."""
+
+    def test_html_is_stripped(self):
+        """Test tags are removed, script content is dropped and entities are escaped."""
+        self.assertEqual(sanitize_tutor_message("<b>Great</b><script>x()</script> & more"), "Great &amp; more")
+
+    def test_matches_nh3_for_plain_text(self):
+        """Test the plain-text fast path returns exactly what nh3 would."""
+        samples = [
+            "How many apples does Janet have?",
+            "5 > 3",
+            "a b",
+            "﻿Hello",
+            "line\r\nbreak",
+            "nul\x00byte",
+            "It's \"quoted\" – 16 🍎",
+        ]
+        for text in samples:
+            with self.subTest(text=text):
+                self.assertEqual(sanitize_tutor_message(text), nh3.clean(text, tags=set()))
+
+    def test_empty_text(self):
+        """Test empty input is returned unchanged."""
+        self.assertEqual(sanitize_tutor_message(""), "")
+
+
+if __name__ == '__main__':
+    unittest.main()